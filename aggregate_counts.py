@@ -0,0 +1,132 @@
+import argparse
+import glob
+import os
+import shutil
+import tempfile
+import time
+import numpy as np
+from counts import Counts
+from results_store import read_counts, write_counts
+
+# Fibonacci hashing: multiply by 2^64/phi and keep the top bits, so nearby outcomes land in different partitions
+HASH_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+# Target (outcome, count) entries per partition; bounds the memory of one reduce task
+PARTITION_ENTRIES = 1 << 22
+
+def partition_of(outcomes, bits):
+    if bits == 0:
+        return np.zeros(outcomes.size, dtype=np.uint64)
+    return (outcomes * HASH_MULTIPLIER) >> np.uint64(64 - bits)
+
+def count_files(paths, pattern='mil-*'):
+    # Files are taken as given; directories contribute their files matching `pattern`
+    files = []
+    for path in paths:
+        if os.path.isdir(path):
+            files += sorted(f for f in glob.glob(os.path.join(path, pattern)) if f.endswith(('.csv', '.npz')))
+        else:
+            files.append(path)
+    return files
+
+def _partition_bits(files, workers):
+    # Enough partitions to keep every worker busy and each partition near PARTITION_ENTRIES
+    estimated_entries = sum(os.path.getsize(f) for f in files) // 16
+    partitions = max(4 * workers, estimated_entries // PARTITION_ENTRIES, 1)
+    return int(partitions - 1).bit_length()
+
+def _map_file(task):
+    # Spill one file as outcomes grouped by partition plus the partition offsets
+    k, path, spill_dir, bits = task
+    counts = read_counts(path)
+    parts = partition_of(counts.outcomes, bits)
+    order = np.argsort(parts, kind='stable')
+    offsets = np.searchsorted(parts[order], np.arange((1 << bits) + 1, dtype=np.uint64))
+    np.save(os.path.join(spill_dir, f"{k}_outcomes.npy"), counts.outcomes[order])
+    np.save(os.path.join(spill_dir, f"{k}_counts.npy"), counts.counts[order])
+    np.save(os.path.join(spill_dir, f"{k}_offsets.npy"), offsets)
+    return counts.num_qubits, counts.shots
+
+def _reduce_partition(task):
+    # Sum and sum of squares per outcome over every file's slice of partition p
+    p, spill_dir, num_files = task
+    outcomes, counts = [], []
+    for k in range(num_files):
+        offsets = np.load(os.path.join(spill_dir, f"{k}_offsets.npy"))
+        lo, hi = int(offsets[p]), int(offsets[p + 1])
+        if lo == hi:
+            continue
+        outcomes.append(np.load(os.path.join(spill_dir, f"{k}_outcomes.npy"), mmap_mode='r')[lo:hi])
+        counts.append(np.load(os.path.join(spill_dir, f"{k}_counts.npy"), mmap_mode='r')[lo:hi])
+    if not outcomes:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64), np.empty(0)
+    counts = np.concatenate(counts)
+    unique, inverse = np.unique(np.concatenate(outcomes), return_inverse=True)
+    totals = np.bincount(inverse, weights=counts, minlength=unique.size).astype(np.int64)
+    squares = np.bincount(inverse, weights=counts.astype(np.float64) ** 2, minlength=unique.size)
+    return unique, totals, squares
+
+def aggregate(files, workers=None, bits=None, spill_dir=None):
+    # Pooled Counts over all files plus the per-outcome mean and sample variance across files
+    from multiprocessing import Pool
+
+    if not files:
+        raise ValueError("no count files to aggregate")
+    workers = workers or os.cpu_count()
+    bits = _partition_bits(files, workers) if bits is None else bits
+    scratch = tempfile.mkdtemp(prefix='aggregate-', dir=spill_dir)
+    try:
+        with Pool(workers) as pool:
+            mapped = pool.map(_map_file, [(k, f, scratch, bits) for k, f in enumerate(files)], chunksize=4)
+            widths = {num_qubits for num_qubits, _ in mapped}
+            if len(widths) > 1:
+                raise ValueError(f"count files mix different qubit counts: {sorted(widths)}")
+            reduced = pool.map(_reduce_partition, [(p, scratch, len(files)) for p in range(1 << bits)])
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    outcomes = np.concatenate([part[0] for part in reduced])
+    order = np.argsort(outcomes)
+    totals = np.concatenate([part[1] for part in reduced])[order]
+    squares = np.concatenate([part[2] for part in reduced])[order]
+
+    # Files where an outcome is absent contribute zero counts to its mean and variance
+    n = len(files)
+    mean = totals / n
+    variance = (squares - n * mean ** 2) / max(n - 1, 1)
+    return Counts(outcomes[order], totals, widths.pop(), presorted=True), mean, np.maximum(variance, 0.0)
+
+def write_statistics(counts, mean, variance, path, num_files):
+    # Result,Count,Mean,Variance rows, or the same columns as arrays in an .npz
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    if path.endswith('.npz'):
+        # Float statistics barely compress, so skip the cost of zlib
+        np.savez(path, outcomes=counts.outcomes, counts=counts.counts, mean=mean, variance=variance,
+                 num_files=num_files, num_qubits=counts.num_qubits)
+        return
+    from counts import indices_to_bitstrings
+
+    with open(path, 'w') as f:
+        f.write('Result,Count,Mean,Variance\n')
+        for bits, total, m, v in zip(indices_to_bitstrings(counts.outcomes, counts.num_qubits), counts.counts,
+                                     mean, variance):
+            f.write(f"{bits.decode()},{total},{m!r},{v!r}\n")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pool many count files into one histogram with per-outcome statistics.")
+    parser.add_argument('paths', nargs='+', help="Count files (.csv or .npz) or directories holding them.")
+    parser.add_argument('--pattern', default='mil-*', help="File name pattern used inside directories.")
+    parser.add_argument('--out', required=True, help="Pooled counts; .npz selects the binary format.")
+    parser.add_argument('--stats', default=None, help="Per-outcome mean and variance across files (.csv or .npz).")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores).")
+    parser.add_argument('--partition-bits', type=int, default=None, help="log2 of the number of hash partitions.")
+    parser.add_argument('--spill-dir', default=None, help="Directory for the temporary partition files.")
+
+    args = parser.parse_args()
+
+    files = count_files(args.paths, args.pattern)
+    start = time.perf_counter()
+    counts, mean, variance = aggregate(files, args.workers, args.partition_bits, args.spill_dir)
+    write_counts(counts, args.out, num_files=len(files))
+    if args.stats:
+        write_statistics(counts, mean, variance, args.stats, len(files))
+    print(f"Pooled {len(files)} files, {counts.shots} shots, {len(counts)} outcomes in {time.perf_counter() - start:.2f} s")
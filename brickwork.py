@@ -0,0 +1,89 @@
+from qiskit import QuantumCircuit
+
+# Single-qubit gate table used by the thirty-bw2-wcsv* scripts: ('h', qubit) or (gate, angle, qubit)
+single_qubit_gates_30 = [
+    ('h', 0), ('rx', 0.5, 1), ('rz', 1.2, 2), ('ry', 0.3, 3), ('rx', 0.8, 4),
+    ('h', 5), ('rx', 1.1, 6), ('rz', 0.9, 7), ('ry', 0.4, 8), ('rx', 0.7, 9),
+    ('h', 10), ('rx', 0.6, 11), ('rz', 1.1, 12), ('ry', 0.2, 13), ('rx', 0.9, 14),
+    ('h', 15), ('rx', 1.2, 16), ('rz', 0.8, 17), ('ry', 0.5, 18), ('rx', 0.4, 19),
+    ('h', 20), ('rx', 0.3, 21), ('rz', 1.4, 22), ('ry', 0.7, 28), ('rx', 0.1, 29)
+]
+
+# Single-qubit gate table used by the sixty-bw* scripts: ('h', qubit) or (gate, qubit, angle)
+single_qubit_gates_60 = [
+    ('h', 0), ('rx', 1, 0.5), ('rz', 2, 1.2), ('ry', 3, 0.3), ('rx', 4, 0.8),
+    ('h', 5), ('rx', 6, 1.1), ('rz', 7, 0.9), ('ry', 8, 0.4), ('rx', 9, 0.7),
+    ('h', 10), ('rx', 11, 0.6), ('rz', 12, 1.1), ('ry', 13, 0.2), ('rx', 14, 0.9),
+    ('h', 15), ('rx', 16, 1.2), ('rz', 17, 0.8), ('ry', 18, 0.5), ('rx', 19, 0.4),
+    ('h', 20), ('rx', 21, 0.3), ('rz', 22, 1.4), ('ry', 23, 0.7), ('rx', 24, 0.1),
+    ('h', 25), ('rx', 26, 0.5), ('rz', 27, 1.2), ('ry', 28, 0.3), ('rx', 29, 0.8),
+    ('h', 30), ('rx', 31, 1.1), ('rz', 32, 0.9), ('ry', 33, 0.4), ('rx', 34, 0.7),
+    ('h', 35), ('rx', 36, 0.6), ('rz', 37, 1.1), ('ry', 38, 0.2), ('rx', 39, 0.9),
+    ('h', 40), ('rx', 41, 1.2), ('rz', 42, 0.8), ('ry', 43, 0.5), ('rx', 44, 0.4),
+    ('h', 45), ('rx', 46, 0.3), ('rz', 47, 1.4), ('ry', 48, 0.7), ('rx', 49, 0.1),
+    ('h', 50), ('rx', 51, 0.5), ('rz', 52, 1.2), ('ry', 53, 0.3), ('rx', 54, 0.8),
+    ('h', 55), ('rx', 56, 1.1), ('rz', 57, 0.9), ('ry', 58, 0.4), ('rx', 59, 0.7)]
+
+
+def brickwork_pairs(num_qubits):
+    # Even and odd layers of nearest-neighbour cx pairs, as in generate_data()
+    return [
+        [(i, i+1) for i in range(0, num_qubits - 1, 2)], [(i, i+1) for i in range(1, num_qubits - 1, 2)]
+    ]
+
+def normalize_gates(single_qubit_gates, angle_first=True):
+    # Turn either table layout into (gate, qubit, angle) triples; 'h' carries no angle
+    gates = []
+    for gate in single_qubit_gates:
+        if gate[0] == 'h':
+            gates.append(('h', gate[1], None))
+        elif angle_first:
+            gates.append((gate[0], gate[2], gate[1]))
+        else:
+            gates.append((gate[0], gate[1], gate[2]))
+    return gates
+
+def default_gates(num_qubits):
+    # The 30-qubit scripts use their own table; every other width repeats the 60-qubit pattern
+    if num_qubits == 30:
+        return normalize_gates(single_qubit_gates_30, angle_first=True)
+
+    pattern = normalize_gates(single_qubit_gates_60, angle_first=False)
+    gates = []
+    for qubit in range(num_qubits):
+        name, _, angle = pattern[qubit % len(pattern)]
+        gates.append((name, qubit, angle))
+    return gates
+
+def generate_data(num_qubits=30, num_layers=7, single_qubit_gates=None, angle_first=True, measure=True,
+                  two_qubit_gates=None):
+    # Build the brickwork circuit of the thirty-bw2/sixty-bw scripts for any width;
+    # two_qubit_gates replaces the [even layer, odd layer] cx pairs
+    if single_qubit_gates is None:
+        gates = default_gates(num_qubits)
+    else:
+        gates = normalize_gates(single_qubit_gates, angle_first)
+    if two_qubit_gates is None:
+        two_qubit_gates = brickwork_pairs(num_qubits)
+
+    qc = QuantumCircuit(num_qubits)
+    for layer in range(num_layers):
+        # Apply single-qubit gates
+        for name, qubit, angle in gates:
+            if name == 'h':
+                qc.h(qubit)
+            elif name == 'rx':
+                qc.rx(angle, qubit)
+            elif name == 'rz':
+                qc.rz(angle, qubit)
+            elif name == 'ry':
+                qc.ry(angle, qubit)
+
+        # Apply two-qubit gates in staggered fashion
+        for q1, q2 in two_qubit_gates[layer % 2]:
+            qc.cx(q1, q2)
+
+    if measure:
+        qc.measure_all()
+
+    return qc
@@ -0,0 +1,87 @@
+import argparse
+import csv
+import hashlib
+import os
+
+FIELDS = ['iteration', 'seed', 'shots', 'num_qubits', 'circuit_hash', 'output', 'status', 'sha256']
+
+def file_sha256(path, chunk_size=1 << 24):
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(chunk_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+class CampaignManifest:
+    """Append-only CSV log of finished iterations; the last row for an iteration wins.
+
+    A row is appended and fsynced only after its output file is complete, so a job
+    killed at any point leaves at worst a missing row or a torn last line, and both
+    just make that iteration pending again.
+    """
+
+    def __init__(self, path, num_qubits=None, circuit_hash=None):
+        self.path = path
+        self.num_qubits = num_qubits
+        self.circuit_hash = circuit_hash
+        self.rows = {}
+        if os.path.exists(path):
+            with open(path, newline='') as f:
+                for row in csv.DictReader(f):
+                    # A torn last line from a killed job has missing fields; treat it as never written
+                    if None in row or None in row.values() or not row['sha256']:
+                        continue
+                    self.rows[int(row['iteration'])] = row
+
+    def is_complete(self, iteration, seed, shots, output, verify=True):
+        row = self.rows.get(iteration)
+        if row is None or row['status'] != 'done':
+            return False
+        # A row written with other parameters describes a different campaign
+        if (int(row['seed']), int(row['shots']), row['output']) != (seed, shots, output):
+            return False
+        if self.circuit_hash and row['circuit_hash'] != self.circuit_hash:
+            return False
+        if not os.path.exists(output):
+            return False
+        return not verify or file_sha256(output) == row['sha256']
+
+    def pending(self, iterations, seed_of, shots, out_pattern, verify=True):
+        # Iterations still to run: never recorded, recorded with other parameters, missing or corrupt on disk
+        return [i for i in iterations if not self.is_complete(i, seed_of(i), shots, out_pattern.format(i=i), verify)]
+
+    def record(self, iteration, seed, shots, output):
+        row = {'iteration': iteration, 'seed': seed, 'shots': shots, 'num_qubits': self.num_qubits,
+               'circuit_hash': self.circuit_hash, 'output': output, 'status': 'done', 'sha256': file_sha256(output)}
+        os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+        size = os.path.getsize(self.path) if os.path.exists(self.path) else 0
+        torn = False
+        if size:
+            with open(self.path, 'rb') as f:
+                f.seek(size - 1)
+                torn = f.read(1) != b'\n'
+        with open(self.path, 'a', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            if not size:
+                writer.writeheader()
+            elif torn:
+                # Terminate a torn last line so this row starts on its own
+                f.write('\r\n')
+            writer.writerow(row)
+            f.flush()
+            os.fsync(f.fileno())
+        self.rows[iteration] = {key: str(value) for key, value in row.items()}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Report the finished and pending iterations of a campaign.")
+    parser.add_argument('manifest', help="Path to the campaign manifest CSV.")
+    parser.add_argument('--no-verify', action='store_true', help="Skip re-hashing the output files.")
+
+    args = parser.parse_args()
+
+    manifest = CampaignManifest(args.manifest)
+    bad = []
+    for i, row in sorted(manifest.rows.items()):
+        if not manifest.is_complete(i, int(row['seed']), int(row['shots']), row['output'], not args.no_verify):
+            bad.append(i)
+    print(f"{len(manifest.rows) - len(bad)} iterations complete, {len(bad)} missing or corrupt: {bad}")
@@ -0,0 +1,270 @@
+import argparse
+import itertools
+import time
+import numpy as np
+from qiskit import ClassicalRegister, QuantumCircuit, QuantumRegister
+from qiskit.circuit.library import HGate, RZGate, ZGate
+
+# Local operation of one fragment at a cut: nothing, Z, a signed Z measurement, or a +-pi/4 Z rotation
+LABELS = ['I', 'Z', 'M', 'R+', 'R-']
+# Most fragment variants per side (5^K for K cuts) before a cut is rejected instead of run: 5^6 at K = 6
+MAX_FRAGMENT_RUNS = 5 ** 6
+
+def zz_terms(theta):
+    # Quasi-probability decomposition of the channel of exp(i theta Z(x)Z) into local operations:
+    #   c^2 (I, I) + s^2 (Z, Z) + cs [(M, R+) - (M, R-) + (R+, M) - (R-, M)]
+    # where M(rho) = P0 rho P0 - P1 rho P1 and R+-(rho) = exp(+-i pi/4 Z) rho exp(-+i pi/4 Z)
+    c, s = np.cos(theta), np.sin(theta)
+    return [(c * c, 'I', 'I'), (s * s, 'Z', 'Z'), (c * s, 'M', 'R+'), (-c * s, 'M', 'R-'),
+            (c * s, 'R+', 'M'), (-c * s, 'R-', 'M')]
+
+def _cut_form(name, params, qubits):
+    # A crossing gate as local gates around exp(i theta ZZ): (theta, {qubit: (before, after)})
+    a, b = qubits
+    if name == 'rzz':
+        return -float(params[0]) / 2, {a: ([], []), b: ([], [])}
+    # CZ = exp(-i pi/4 Z) (x) exp(-i pi/4 Z) . exp(i pi/4 ZZ) up to a global phase
+    rz = RZGate(np.pi / 2)
+    if name == 'cz':
+        return np.pi / 4, {a: ([rz], []), b: ([rz], [])}
+    if name == 'cx':
+        # CX = H_t CZ H_t
+        return np.pi / 4, {a: ([rz], []), b: ([HGate(), rz], [HGate()])}
+    raise ValueError(f"cannot cut '{name}' gates; supported: cx, cz, rzz")
+
+class CutCircuit:
+    """A circuit split into two fragments, every crossing gate replaced by its quasi-probability decomposition.
+
+    Each fragment runs once per combination of local cut operations (5^K per side for K cuts).
+    Results are recombined as sum_ab C[a, b] q_A[a] (x) q_B[b]; C is the Kronecker product of one 5 x 5
+    block per cut and is never built densely.
+    """
+
+    def __init__(self, qc, partition=None):
+        num_qubits = qc.num_qubits
+        partition = list(range(num_qubits // 2)) if partition is None else sorted(partition)
+        self.qubits = [partition, [q for q in range(num_qubits) if q not in set(partition)]]
+        self.num_qubits = num_qubits
+        local = [{q: i for i, q in enumerate(side)} for side in self.qubits]
+        side_of = {q: s for s in (0, 1) for q in self.qubits[s]}
+
+        # Per side: ('gate', operation, local qubits) and ('cut', k, local qubit) entries in circuit order
+        self.templates = [[], []]
+        self.thetas = []
+        for instruction in qc.data:
+            operation = instruction.operation
+            if operation.name in ('measure', 'barrier'):
+                continue
+            qubits = [qc.find_bit(q).index for q in instruction.qubits]
+            sides = {side_of[q] for q in qubits}
+            if len(sides) == 1:
+                s = sides.pop()
+                self.templates[s].append(('gate', operation, [local[s][q] for q in qubits]))
+                continue
+            if len(qubits) != 2:
+                raise ValueError(f"cannot cut a {len(qubits)}-qubit '{operation.name}' gate")
+            theta, local_gates = _cut_form(operation.name, operation.params, qubits)
+            k = len(self.thetas)
+            self.thetas.append(theta)
+            for q in qubits:
+                s = side_of[q]
+                before, after = local_gates[q]
+                self.templates[s] += [('gate', gate, [local[s][q]]) for gate in before]
+                self.templates[s].append(('cut', k, local[s][q]))
+                self.templates[s] += [('gate', gate, [local[s][q]]) for gate in after]
+        if len(LABELS) ** len(self.thetas) > MAX_FRAGMENT_RUNS:
+            raise ValueError(f"{len(self.thetas)} cut gates need {len(LABELS) ** len(self.thetas)} fragment runs per "
+                             f"side, more than {MAX_FRAGMENT_RUNS}; choose a partition with fewer crossing gates")
+        self.configs = [list(itertools.product(LABELS, repeat=len(self.thetas))) for _ in range(2)]
+        self.blocks = [self._block(theta) for theta in self.thetas]
+
+    @staticmethod
+    def _block(theta):
+        # B[a, b]: weight of the terms of one cut with label a on side 0 and label b on side 1
+        block = np.zeros((len(LABELS), len(LABELS)))
+        for weight, side_a, side_b in zz_terms(theta):
+            block[LABELS.index(side_a), LABELS.index(side_b)] += weight
+        return block
+
+    def _apply_coefficients(self, table):
+        # C @ table for C = B_0 (x) B_1 (x) ..., one cut axis at a time; cut 0 is the slowest config index
+        tensor = table.reshape([len(LABELS)] * len(self.blocks) + [-1])
+        for k, block in enumerate(self.blocks):
+            tensor = np.moveaxis(np.tensordot(block, tensor, axes=([1], [k])), 0, k)
+        return tensor.reshape(table.shape)
+
+    def overhead(self):
+        # gamma = sum |coefficients| per cut; shots needed grow as gamma^2 for the same error
+        gamma = float(np.prod([1 + 2 * abs(np.sin(2 * theta)) for theta in self.thetas]))
+        return {'cuts': len(self.thetas), 'gamma': gamma, 'sampling_overhead': gamma ** 2,
+                'fragment_runs': [len(configs) for configs in self.configs],
+                'terms': 6 ** len(self.thetas)}
+
+    def fragment_circuit(self, side, config):
+        # Fragment with its cut labels filled in; M writes to the 'cut' register, the end is measured to 'meas'
+        n = len(self.qubits[side])
+        qreg = QuantumRegister(n, 'q')
+        cut_reg = ClassicalRegister(max(len(self.thetas), 1), 'cut')
+        meas_reg = ClassicalRegister(n, 'meas')
+        qc = QuantumCircuit(qreg, cut_reg, meas_reg)
+        for kind, item, qubits in self.templates[side]:
+            if kind == 'gate':
+                qc.append(item, [qreg[q] for q in qubits])
+                continue
+            label = config[item]
+            if label == 'Z':
+                qc.append(ZGate(), [qreg[qubits]])
+            elif label == 'R+':
+                qc.append(RZGate(-np.pi / 2), [qreg[qubits]])
+            elif label == 'R-':
+                qc.append(RZGate(np.pi / 2), [qreg[qubits]])
+            elif label == 'M':
+                qc.measure(qreg[qubits], cut_reg[item])
+        qc.measure(qreg, meas_reg)
+        return qc
+
+    def simulate_exact(self, side, config):
+        # Quasi-probabilities of one fragment: statevector branches carry the +-1 of every M
+        from statevec_engine import allocate_state, apply_ops
+
+        n = len(self.qubits[side])
+        psi = allocate_state(n)
+        branches = [(1.0, psi)]
+        ops = []
+        for kind, item, qubits in self.templates[side]:
+            if kind == 'gate':
+                ops.append((tuple(qubits), np.asarray(item.to_matrix(), dtype=complex)))
+                continue
+            label = config[item]
+            if label == 'I':
+                continue
+            if label != 'M':
+                gate = {'Z': ZGate(), 'R+': RZGate(-np.pi / 2), 'R-': RZGate(np.pi / 2)}[label]
+                ops.append(((qubits,), gate.to_matrix()))
+                continue
+            branches = [(sign, apply_ops(state, n, ops)) for sign, state in branches]
+            ops = []
+            # Project onto |0> and |1> of the cut qubit; the |1> branch enters with a minus sign
+            split = []
+            bit = (np.arange(1 << n) >> qubits) & 1
+            for sign, state in branches:
+                split.append((sign, np.where(bit == 0, state, 0)))
+                split.append((-sign, np.where(bit == 1, state, 0)))
+            branches = split
+        quasi = np.zeros(1 << n)
+        for sign, state in branches:
+            state = apply_ops(state, n, ops)
+            quasi += sign * (state.real ** 2 + state.imag ** 2)
+        return np.arange(1 << n, dtype=np.uint64), quasi
+
+    def run(self, engine='exact', shots=100000, seed=None, method='automatic'):
+        # Every fragment variant of both sides as sparse (outcomes, quasi-probabilities)
+        if engine == 'exact':
+            return [[self.simulate_exact(side, config) for config in self.configs[side]] for side in (0, 1)]
+        if engine != 'aer':
+            raise ValueError(f"unknown fragment engine '{engine}'")
+
+        from qiskit import transpile
+        from qiskit_aer import AerSimulator
+        from counts import bitstrings_to_indices
+
+        # Wide fragments need method='matrix_product_state'; Aer handles the mid-circuit measurements
+        simulator = AerSimulator(method=method)
+        results = []
+        for side in (0, 1):
+            circuits = [self.fragment_circuit(side, config) for config in self.configs[side]]
+            # One batched job per side
+            result = simulator.run(transpile(circuits, simulator), shots=shots, seed_simulator=seed).result()
+            side_results = []
+            for i in range(len(circuits)):
+                data = result.get_counts(i)
+                keys = [key.split(' ') for key in data]
+                outcomes = bitstrings_to_indices([meas for meas, _ in keys], len(self.qubits[side]))
+                signs = np.array([1 - 2 * (cut.count('1') % 2) for _, cut in keys])
+                weights = signs * np.fromiter(data.values(), dtype=np.float64, count=len(data)) / shots
+                side_results.append((outcomes, weights))
+            results.append(side_results)
+        return results
+
+    def _split_qubits(self, qubits):
+        # Positions of the requested qubits on each side, as local indices, and their output bit positions
+        parts = [([], []), ([], [])]
+        for position, q in enumerate(qubits):
+            side = 0 if q in self.qubits[0] else 1
+            parts[side][0].append(self.qubits[side].index(q))
+            parts[side][1].append(position)
+        return parts
+
+    def marginal(self, results, qubits):
+        # Reconstructed distribution of `qubits` (qubits[j] is bit j): QA^T C QB, then bits interleaved
+        parts = self._split_qubits(qubits)
+        tables = []
+        spreads = []
+        for side in (0, 1):
+            local, positions = parts[side]
+            table = np.zeros((len(results[side]), 1 << len(local)))
+            for i, (outcomes, weights) in enumerate(results[side]):
+                keys = np.zeros(outcomes.size, dtype=np.int64)
+                for j, q in enumerate(local):
+                    keys |= ((outcomes >> np.uint64(q)) & np.uint64(1)).astype(np.int64) << j
+                table[i] = np.bincount(keys, weights=weights, minlength=table.shape[1])
+            tables.append(table)
+            index = np.arange(1 << len(local))
+            spreads.append(sum(((index >> j) & 1) << p for j, p in enumerate(positions)) if positions
+                           else np.zeros(1, dtype=np.int64))
+        joint = tables[0].T @ self._apply_coefficients(tables[1])
+        marginal = np.zeros(1 << len(qubits))
+        marginal[spreads[0][:, None] | spreads[1][None, :]] = joint
+        return marginal
+
+    def expectation_z(self, results, qubits):
+        # <Z...Z> on `qubits`: the product of each side's parity expectation, contracted with C
+        parts = self._split_qubits(qubits)
+        values = []
+        for side in (0, 1):
+            mask = np.uint64(sum(1 << q for q in parts[side][0]))
+            side_values = []
+            for outcomes, weights in results[side]:
+                masked = outcomes & mask
+                parity = np.zeros(outcomes.size, dtype=np.uint64)
+                while masked.any():
+                    parity ^= masked & np.uint64(1)
+                    masked >>= np.uint64(1)
+                side_values.append(np.sum(weights * (1 - 2 * parity.astype(np.float64))))
+            values.append(np.array(side_values))
+        return float(values[0] @ self._apply_coefficients(values[1]))
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+
+    parser = argparse.ArgumentParser(description="Cut the brickwork circuit in two and rebuild its marginals.")
+    parser.add_argument('--qubits', type=int, default=12, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--marginal', type=int, nargs='+', default=None, help="Qubits of the rebuilt marginal.")
+    parser.add_argument('--engine', default='exact', choices=['exact', 'aer'], help="Fragment simulator.")
+    parser.add_argument('--shots', type=int, default=100000, help="Shots per fragment run with --engine aer.")
+    parser.add_argument('--method', default='automatic', help="Aer method of the fragment runs.")
+    parser.add_argument('--compare', action='store_true', help="Compare with the uncut statevector (small n).")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits, args.layers, measure=False)
+    cut = CutCircuit(qc)
+    overhead = cut.overhead()
+    print(f"{overhead['cuts']} cut gates: gamma {overhead['gamma']:.1f}, sampling overhead "
+          f"{overhead['sampling_overhead']:.0f}x, fragment runs {overhead['fragment_runs']}, {overhead['terms']} terms")
+
+    start = time.perf_counter()
+    results = cut.run(args.engine, args.shots, seed=1, method=args.method)
+    print(f"Ran the fragments in {time.perf_counter() - start:.2f} s")
+
+    qubits = args.marginal or [args.qubits // 2 - 1, args.qubits // 2]
+    marginal = cut.marginal(results, qubits)
+    print(f"Marginal on qubits {qubits}: {np.round(marginal, 4)}")
+    print(f"<Z...Z> on qubits {qubits}: {cut.expectation_z(results, qubits):.4f}")
+
+    if args.compare:
+        from qiskit.quantum_info import Statevector
+
+        exact = Statevector(qc).probabilities(qubits)
+        print(f"Uncut marginal:             {np.round(exact, 4)}  (max error {np.abs(exact - marginal).max():.1e})")
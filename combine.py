@@ -1,5 +1,9 @@
 import csv
-from collections import defaultdict
+from counts import Counts
+from product_distribution import ProductDistribution
+
+# Joint outcomes exported; the full cross product of two 30-qubit histograms is never built
+TOP_K = 100000
 
 def load_counts(filename):
     counts = {}
@@ -12,19 +16,13 @@ def load_counts(filename):
     return counts
 
 def combine_counts(counts1, counts2):
-    combined_counts = defaultdict(int)
-    for state1, count1 in counts1.items():
-        for state2, count2 in counts2.items():
-            combined_state = state1 + state2  # Combine states
-            combined_counts[combined_state] += count1 + count2
-    return combined_counts
-
-def save_combined_counts(filename, combined_counts):
-    with open(filename, 'w', newline='') as csvfile:
-        csvwriter = csv.writer(csvfile)
-        csvwriter.writerow(['State', 'Counts'])
-        for state, count in combined_counts.items():
-            csvwriter.writerow([state, count])
+    # Independent halves multiply: P(s2 s1) = P1(s1) P2(s2), with counts1 on the low qubits, so the
+    # joint bitstring is state2 + state1 in qiskit order (not state1 + state2, and not count1 + count2)
+    return ProductDistribution.from_counts([Counts.from_dict(counts1), Counts.from_dict(counts2)])
+
+def save_combined_counts(filename, combined_counts, k=TOP_K, shots=None):
+    # Top-k joint outcomes; expected counts when shots is given, probabilities otherwise
+    combined_counts.to_csv(filename, k, shots)
 
 # Load counts from the individual 30-qubit simulations
 counts1 = load_counts('simulation_results_3.csv')
@@ -34,7 +32,6 @@ counts2 = load_counts('simulation_results_4.csv')
 combined_counts = combine_counts(counts1, counts2)
 
 # Save combined results
-save_combined_counts('combined_simulation_results2.csv', combined_counts)
+save_combined_counts('combined_simulation_results2.csv', combined_counts, shots=sum(counts1.values()))
 
 print("Combined simulation results saved to 'combined_simulation_results2.csv'.")
-
@@ -0,0 +1,155 @@
+import argparse
+import os
+import time
+import numpy as np
+from planner import METHODS, MEMORY_FRACTION, available_memory, format_bytes, interaction_components, plan
+
+# Engines a component may be sent to, cheapest estimate first; 'partitioned' would need cutting
+COMPONENT_METHODS = [m for m in METHODS if m not in ('density_matrix', 'partitioned')]
+
+def find_components(qc):
+    # Qubit blocks no gate connects, each as a sorted list; every multi-qubit gate joins all its qubits
+    edges = []
+    for instruction in qc.data:
+        if instruction.operation.name in ('measure', 'barrier'):
+            continue
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        edges += zip(qubits[:-1], qubits[1:])
+    return interaction_components(qc.num_qubits, edges)
+
+def component_circuit(qc, qubits):
+    # The gates of one component on len(qubits) qubits; local qubit j is qubits[j], measurements dropped
+    from qiskit import QuantumCircuit
+
+    local = {q: j for j, q in enumerate(qubits)}
+    sub = QuantumCircuit(len(qubits))
+    for instruction in qc.data:
+        if instruction.operation.name in ('measure', 'barrier'):
+            continue
+        indices = [qc.find_bit(q).index for q in instruction.qubits]
+        if indices[0] in local:
+            sub.append(instruction.operation, [local[q] for q in indices])
+    return sub
+
+def choose_engine(sub, memory=None, exact=False):
+    # Smallest adequate engine for one component; exact results need its statevector
+    methods = ['statevector'] if exact else COMPONENT_METHODS
+    return plan(sub, memory, methods=methods, verbose=False)['method']
+
+def _component_state(sub):
+    from one_pass_simulation import final_statevector
+
+    return final_statevector(sub)
+
+def _component_samples(sub, method, shots, seed):
+    # (shots, width) bit rows in draw order, column j being local qubit j
+    if method == 'matrix_product_state':
+        from mps_engine import circuit_to_mps
+
+        return circuit_to_mps(sub).sample_bits(shots, seed)
+    rng = np.random.default_rng(seed)
+    if method == 'stabilizer':
+        from stabilizer_engine import StabilizerState, _unpack_rows
+
+        words, counts = StabilizerState(sub.num_qubits).apply_circuit(sub).sample_words(shots, rng)
+        return rng.permutation(np.repeat(_unpack_rows(words, sub.num_qubits), counts, axis=0))
+    if method == 'statevector':
+        from shot_sampler import probabilities, sample_indices
+
+        indices = sample_indices(probabilities(_component_state(sub)), shots, rng)
+    else:
+        # Only reached for methods without a native engine
+        from repetition import prepare_simulator, simulate_counts
+
+        simulator, compiled_circuit = prepare_simulator(sub, threads=1, method=method)
+        counts = simulate_counts(simulator, compiled_circuit, sub.num_qubits, shots, int(rng.integers(2 ** 63)))
+        indices = np.repeat(counts.outcomes, counts.counts)
+    # Histogram-ordered draws become i.i.d. rows again once shuffled
+    indices = rng.permutation(indices)
+    return ((indices[:, None] >> np.arange(sub.num_qubits, dtype=np.uint64)) & np.uint64(1)).astype(np.uint8)
+
+def simulate_components(qc, workers=None, memory=None):
+    # Exact factored state of a circuit whose components each fit as a statevector; components run
+    # concurrently in threads (numpy releases the GIL), so no statevector is pickled between processes
+    from concurrent.futures import ThreadPoolExecutor
+    from factored_statevector import FactoredStatevector
+
+    components = find_components(qc)
+    circuits = [component_circuit(qc, qubits) for qubits in components]
+    total = sum(16 * 2 ** len(qubits) for qubits in components)
+    budget = (memory or available_memory()) * MEMORY_FRACTION
+    if total > budget:
+        raise MemoryError(f"{len(components)} component statevectors need {format_bytes(total)}, "
+                          f"more than {format_bytes(budget)}")
+    with ThreadPoolExecutor(workers or min(os.cpu_count(), len(circuits))) as pool:
+        states = list(pool.map(_component_state, circuits))
+    return FactoredStatevector(states, components)
+
+def sample_components(qc, shots, seed=None, workers=None, memory=None):
+    # Joint shot counts: each component is sampled on its own engine and the i-th shots of all components
+    # are joined, which is an exact joint sample because the components are independent.
+    # Returns a Counts up to 64 qubits, otherwise a qiskit-style {'bitstring': count}
+    from concurrent.futures import ThreadPoolExecutor
+    from counts import Counts
+
+    components = find_components(qc)
+    circuits = [component_circuit(qc, qubits) for qubits in components]
+    methods = [choose_engine(sub, memory) for sub in circuits]
+    seeds = np.random.SeedSequence(seed).spawn(len(circuits))
+    with ThreadPoolExecutor(workers or min(os.cpu_count(), len(circuits))) as pool:
+        samples = list(pool.map(_component_samples, circuits, methods, [shots] * len(circuits), seeds))
+
+    n = qc.num_qubits
+    if n <= 64:
+        outcomes = np.zeros(shots, dtype=np.uint64)
+        for qubits, bits in zip(components, samples):
+            for j, q in enumerate(qubits):
+                outcomes |= bits[:, j].astype(np.uint64) << np.uint64(q)
+        unique, counts = np.unique(outcomes, return_counts=True)
+        return Counts(unique, counts, n, presorted=True)
+    # Wider outcomes: bit rows with qubit 0 rightmost, deduplicated as packed bytes
+    chars = np.empty((shots, n), dtype=np.uint8)
+    for qubits, bits in zip(components, samples):
+        chars[:, [n - 1 - q for q in qubits]] = bits
+    packed = np.ascontiguousarray(np.packbits(chars, axis=1))
+    _, first, counts = np.unique(packed.view(f'V{packed.shape[1]}').ravel(), return_index=True, return_counts=True)
+    strings = np.ascontiguousarray(chars[first] + ord('0')).view(f'S{n}').ravel()
+    return {s.decode(): int(c) for s, c in zip(strings, counts)}
+
+def describe(qc, memory=None):
+    # One line per distinct component shape: size, count and the engine it would run on
+    shapes = {}
+    for qubits in find_components(qc):
+        method = choose_engine(component_circuit(qc, qubits), memory)
+        shapes.setdefault((len(qubits), method), []).append(qubits)
+    return sorted(shapes.items())
+
+if __name__ == "__main__":
+    from qiskit import QuantumCircuit
+
+    parser = argparse.ArgumentParser(description="Simulate the non-interacting qubit blocks of a circuit separately.")
+    parser.add_argument('--qubits', type=int, default=60, help="Width of the H + cx(i, i + n/2) circuit of divide-sixty*.py.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Number of sampled shots.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for shot sampling.")
+    parser.add_argument('--workers', type=int, default=None, help="Components simulated at once.")
+    parser.add_argument('--csv', default=None, help="Write Result,Count rows to this CSV file.")
+
+    args = parser.parse_args()
+
+    half = args.qubits // 2
+    qc = QuantumCircuit(args.qubits)
+    for i in range(args.qubits):
+        qc.h(i)
+    for i in range(half):
+        qc.cx(i, i + half)
+
+    for (size, method), blocks in describe(qc):
+        print(f"{len(blocks)} components of {size} qubits on {method}, e.g. {blocks[0]}")
+
+    start = time.perf_counter()
+    counts = sample_components(qc, args.shots, args.seed, args.workers)
+    print(f"Sampled {args.shots} shots ({len(counts)} outcomes) in {time.perf_counter() - start:.2f} s")
+    if args.csv:
+        from one_pass_simulation import write_data_to_csv
+
+        write_data_to_csv(counts if isinstance(counts, dict) else counts.to_dict(), None, args.csv)
@@ -0,0 +1,155 @@
+import csv
+import os
+import numpy as np
+
+def bitstrings_to_indices(bitstrings, num_qubits=None):
+    # Vectorised '0101...' -> integer, qiskit order (rightmost character is qubit 0)
+    strings = np.asarray([s.replace(' ', '') for s in bitstrings] if not isinstance(bitstrings, np.ndarray)
+                         else bitstrings)
+    if strings.size == 0:
+        return np.empty(0, dtype=np.uint64)
+    if num_qubits is None:
+        num_qubits = len(strings[0])
+    if num_qubits > 64:
+        raise ValueError(f"{num_qubits}-qubit bitstrings do not fit the 64-bit integer outcomes; "
+                         "Counts holds at most 64 qubits")
+    chars = np.frombuffer(strings.astype(f'S{num_qubits}').tobytes(), dtype=np.uint8).reshape(-1, num_qubits)
+    return _bits_to_indices(chars - ord('0'))
+
+def _bits_to_indices(bits):
+    # Rows of 0/1 (most significant first) -> uint64 indices, packed eight bits at a time
+    padded = np.zeros((bits.shape[0], 64), dtype=np.uint8)
+    padded[:, 64 - bits.shape[1]:] = bits
+    return np.packbits(padded, axis=1).view('>u8').ravel().astype(np.uint64)
+
+def indices_to_bitstrings(indices, num_qubits):
+    # Vectorised integer -> fixed-width bitstring, returned as an 'S' array
+    indices = np.asarray(indices, dtype=np.uint64)
+    shifts = np.arange(num_qubits - 1, -1, -1, dtype=np.uint64)
+    chars = ((indices[:, None] >> shifts) & np.uint64(1)).astype(np.uint8) + ord('0')
+    return chars.view(f'S{num_qubits}').ravel()
+
+def read_result_count_csv(csv_file):
+    # Fast parser for 'Result,Count' files: byte-level, no per-row Python objects
+    with open(csv_file, 'rb') as cf:
+        data = np.frombuffer(cf.read(), dtype=np.uint8)
+
+    newlines = np.flatnonzero(data == ord('\n'))
+    if data.size and data[-1] != ord('\n'):
+        newlines = np.append(newlines, data.size)
+    starts = np.concatenate(([0], newlines[:-1] + 1))[1:]
+    ends = newlines[1:]
+    if ends.size and data[ends[0] - 1] == ord('\r'):
+        ends = ends - 1
+    keep = ends > starts
+    starts, ends = starts[keep], ends[keep]
+    if starts.size == 0:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64), 0
+
+    commas = np.flatnonzero(data == ord(','))
+    commas = commas[np.searchsorted(commas, starts)]
+    num_qubits = int(commas[0] - starts[0])
+    if np.any(commas - starts != num_qubits):
+        raise ValueError(f"{csv_file}: bitstrings of different widths")
+
+    bits = data[starts[:, None] + np.arange(num_qubits)] - ord('0')
+    outcomes = _bits_to_indices(bits)
+
+    # Right-align the count digits and weight them by powers of ten
+    widths = ends - commas - 1
+    width = int(widths.max())
+    positions = ends[:, None] - width + np.arange(width)
+    digits = data[np.maximum(positions, 0)].astype(np.int64) - ord('0')
+    digits[positions <= commas[:, None]] = 0
+    counts = digits @ (10 ** np.arange(width - 1, -1, -1, dtype=np.int64))
+    return outcomes, counts, num_qubits
+
+class Counts:
+    """Measurement counts as parallel arrays: sorted uint64 outcome indices and int64 counts."""
+
+    def __init__(self, outcomes, counts, num_qubits, presorted=False):
+        outcomes = np.asarray(outcomes, dtype=np.uint64)
+        counts = np.asarray(counts, dtype=np.int64)
+        if not presorted:
+            outcomes, inverse = np.unique(outcomes, return_inverse=True)
+            counts = np.bincount(inverse.ravel(), weights=counts, minlength=outcomes.size).astype(np.int64)
+        self.outcomes = outcomes
+        self.counts = counts
+        self.num_qubits = num_qubits
+
+    @classmethod
+    def from_dict(cls, data, num_qubits=None):
+        keys = [key.replace(' ', '') for key in data]
+        if num_qubits is None:
+            num_qubits = len(keys[0]) if keys else 0
+        outcomes = bitstrings_to_indices(keys, num_qubits)
+        return cls(outcomes, np.fromiter(data.values(), dtype=np.int64, count=len(data)), num_qubits)
+
+    @classmethod
+    def from_csv(cls, csv_file):
+        with open(csv_file, newline='') as cf:
+            header = next(csv.reader(cf), [])
+        if len(header) == 2:
+            outcomes, counts, num_qubits = read_result_count_csv(csv_file)
+            return cls(outcomes, counts, num_qubits)
+
+        # Wider layouts (e.g. Result,Count,State Vector): counts end at the first blank row
+        data = {}
+        with open(csv_file, newline='') as cf:
+            csv_reader = csv.reader(cf)
+            next(csv_reader)
+            for row in csv_reader:
+                if not row or not row[0]:
+                    break
+                data[row[0]] = int(row[1])
+        return cls.from_dict(data)
+
+    def to_dict(self):
+        strings = indices_to_bitstrings(self.outcomes, self.num_qubits)
+        return {s.decode(): int(c) for s, c in zip(strings, self.counts)}
+
+    def to_csv(self, csv_file, header=('Result', 'Count')):
+        # Byte-identical to csv.writer output for the same rows (\r\n line endings)
+        os.makedirs(os.path.dirname(csv_file) or '.', exist_ok=True)
+        lines = np.char.add(np.char.add(indices_to_bitstrings(self.outcomes, self.num_qubits), b','),
+                            self.counts.astype('S20'))
+        with open(csv_file, 'wb') as cf:
+            cf.write((','.join(header) + '\r\n').encode())
+            if lines.size:
+                cf.write(b'\r\n'.join(lines.tolist()) + b'\r\n')
+
+    @property
+    def shots(self):
+        return int(self.counts.sum())
+
+    def __len__(self):
+        return int(self.outcomes.size)
+
+    def __eq__(self, other):
+        return (isinstance(other, Counts) and self.num_qubits == other.num_qubits
+                and np.array_equal(self.outcomes, other.outcomes) and np.array_equal(self.counts, other.counts))
+
+    def merge(self, *others):
+        # Vectorised replacement for merge_counts()/combine_results(): add counts of equal outcomes
+        parts = (self,) + others
+        return Counts(np.concatenate([part.outcomes for part in parts]),
+                      np.concatenate([part.counts for part in parts]), self.num_qubits)
+
+    def marginalize(self, qubits):
+        # Keep `qubits` only; qubits[j] becomes bit j of the marginal outcome
+        outcomes = np.zeros_like(self.outcomes)
+        for position, qubit in enumerate(qubits):
+            outcomes |= ((self.outcomes >> np.uint64(qubit)) & np.uint64(1)) << np.uint64(position)
+        return Counts(outcomes, self.counts, len(qubits))
+
+    def top_k(self, k):
+        # The k most frequent outcomes as (outcomes, counts), most frequent first
+        k = min(k, self.outcomes.size)
+        if k == 0:
+            return self.outcomes[:0], self.counts[:0]
+        order = np.argpartition(-self.counts, k - 1)[:k]
+        order = order[np.lexsort((self.outcomes[order], -self.counts[order]))]
+        return self.outcomes[order], self.counts[order]
+
+    def probabilities(self):
+        return self.counts / max(self.shots, 1)
@@ -35,9 +35,11 @@ def run_qiskit_simulation(qc):
     return statevector
 
 def combine_results(statevector1, statevector2):
-    # Combine statevectors from both sub-circuits
-    combined_statevector = np.kron(statevector1, statevector2)
-    return combined_statevector
+    # Keep the product factored: np.kron of two 2^30 vectors would need 2^60 amplitudes.
+    # statevector1 holds qubits 0-29, the low bits, i.e. the state np.kron(statevector2, statevector1)
+    from factored_statevector import FactoredStatevector
+
+    return FactoredStatevector([np.asarray(statevector1), np.asarray(statevector2)])
 
 # Main
 qc = generate_and_split_circuit()
@@ -48,5 +50,6 @@ statevector2 = run_qiskit_simulation(qc2)
 
 combined_statevector = combine_results(statevector1, statevector2)
 
-print("Combined Statevector:", combined_statevector)
+print(f"Combined Statevector: {combined_statevector.num_qubits}-qubit product state, "
+      f"<0...0|psi> = {combined_statevector.amplitude(0):.3e}")
 
@@ -0,0 +1,105 @@
+import argparse
+import os
+import time
+import numpy as np
+
+# Widest circuit whose complete probability vector is written (2^30 float64 = 8 GiB)
+FULL_VECTOR_QUBITS = 30
+# Amplitudes squared per step when turning a statevector into probabilities in place
+CHUNK_SIZE = 1 << 22
+
+def probabilities_in_place(psi, chunk_size=CHUNK_SIZE):
+    # |psi|^2 written over the first half of psi's own buffer: no second 2^n array, so a 30-qubit
+    # state needs 16 GiB rather than 24. psi is destroyed; the result is a float64 view into it
+    pairs = psi.view(np.float64)
+    for start in range(0, psi.size, chunk_size):
+        chunk = pairs[2 * start:2 * (start + chunk_size)]
+        # Writes land at or before the pairs still to be read, so later chunks are intact
+        pairs[start:start + chunk.size // 2] = chunk[0::2] ** 2 + chunk[1::2] ** 2
+    return pairs[:psi.size]
+
+def outcome_indices(outcomes, num_qubits):
+    # Bitstrings (qubit 0 rightmost) or integers -> uint64 indices
+    from counts import bitstrings_to_indices
+
+    outcomes = list(outcomes)
+    if outcomes and isinstance(outcomes[0], str):
+        return bitstrings_to_indices(outcomes, num_qubits)
+    return np.asarray(outcomes, dtype=np.uint64)
+
+def outcome_probabilities(qc, outcomes):
+    # Exact probabilities of selected outcomes of a circuit too wide for its full vector: factored
+    # over independent components when every one fits as a statevector, otherwise from an exact MPS
+    from component_split import find_components, simulate_components
+
+    qc = qc.remove_final_measurements(inplace=False)
+    if qc.num_qubits > 64:
+        raise ValueError(f"outcome sets are stored as 64-bit indices, the circuit has {qc.num_qubits} qubits")
+    outcomes = outcome_indices(outcomes, qc.num_qubits)
+    if len(find_components(qc)) > 1:
+        try:
+            return outcomes, np.abs(simulate_components(qc).amplitudes(outcomes)) ** 2
+        except MemoryError:
+            pass
+    from mps_engine import circuit_to_mps
+
+    bits = ((outcomes[:, None] >> np.arange(qc.num_qubits, dtype=np.uint64)) & np.uint64(1)).astype(np.intp)
+    return outcomes, np.abs(circuit_to_mps(qc).amplitudes(bits)) ** 2
+
+def exact_probabilities(qc, outcomes=None, engine='native', device='CPU'):
+    # (outcomes, probabilities): the complete vector (outcomes None) up to FULL_VECTOR_QUBITS, otherwise
+    # the probabilities of the requested outcomes
+    from one_pass_simulation import final_statevector
+
+    if qc.num_qubits > FULL_VECTOR_QUBITS:
+        if outcomes is None:
+            raise ValueError(f"{qc.num_qubits} qubits have no storable probability vector; request an outcome set")
+        return outcome_probabilities(qc, outcomes)
+    probs = probabilities_in_place(final_statevector(qc, engine, device))
+    if outcomes is None:
+        return None, probs
+    outcomes = outcome_indices(outcomes, qc.num_qubits)
+    return outcomes, probs[outcomes.astype(np.intp)]
+
+def write_exact(qc, path, outcomes=None, shots=None, seed=None, counts_path=None, **metadata):
+    # The exact distribution is the primary output; shot counts are only derived from it on request
+    from results_store import circuit_hash, counts_from_probabilities, write_counts, write_probabilities_npz
+
+    start = time.perf_counter()
+    outcomes, probs = exact_probabilities(qc, outcomes)
+    write_probabilities_npz(probs, path, qc.num_qubits, outcomes, circuit_hash=circuit_hash(qc),
+                            seconds=time.perf_counter() - start, **metadata)
+    if shots and counts_path:
+        write_counts(counts_from_probabilities(path, shots, seed), counts_path, shots=shots, source=path)
+    return outcomes, probs
+
+def read_outcomes(path):
+    # Outcome set to evaluate: the outcomes of a stored result (Result,Count CSV or .npz), or one bitstring per line
+    if path.endswith('.npz') or path.endswith('.csv'):
+        from results_store import read_counts
+
+        return read_counts(path).outcomes
+    with open(path) as f:
+        return [line.strip() for line in f if line.strip()]
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+
+    parser = argparse.ArgumentParser(description="Write the exact output distribution of the brickwork circuit.")
+    parser.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--out', required=True, help="Output .npz file for the probabilities.")
+    parser.add_argument('--outcomes', default=None, help="Outcome set (counts file or bitstring list); required above "
+                                                        f"{FULL_VECTOR_QUBITS} qubits.")
+    parser.add_argument('--shots', type=int, default=None, help="Also derive this many shot counts.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for derived shot counts.")
+    parser.add_argument('--counts', default=None, help="Output file for the derived counts (.npz or .csv).")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits, args.layers, measure=False)
+    start = time.perf_counter()
+    outcomes, probs = write_exact(qc, args.out, read_outcomes(args.outcomes) if args.outcomes else None,
+                                  args.shots, args.seed, args.counts)
+    print(f"{probs.size} exact probabilities (total {probs.sum():.6f}) in {time.perf_counter() - start:.2f} s, "
+          f"{os.path.getsize(args.out) / 1e6:.1f} MB")
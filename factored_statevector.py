@@ -0,0 +1,132 @@
+import argparse
+import time
+import numpy as np
+from product_distribution import ProductDistribution, _parity
+
+class FactoredStatevector:
+    """Product state psi_0 (x) psi_1 (x) ... kept as its factors, one (statevector, qubits) pair each.
+
+    Factor f's local bit j is global qubit qubits[f][j]; by default factor 0 holds the lowest qubits, so
+    FactoredStatevector([sv1, sv2]) is the state np.kron(sv2, sv1) without its 2^(n1 + n2) amplitudes.
+    """
+
+    def __init__(self, statevectors, qubits=None):
+        self.factors = []
+        offset = 0
+        for f, psi in enumerate(statevectors):
+            psi = np.asarray(psi)
+            width = int(psi.size).bit_length() - 1
+            if psi.size != 1 << width:
+                raise ValueError(f"factor {f} has {psi.size} amplitudes, not a power of two")
+            self.factors.append((psi, list(qubits[f]) if qubits else list(range(offset, offset + width))))
+            offset += width
+        self.num_qubits = sum(len(q) for _, q in self.factors)
+        self._distribution = None
+
+    @classmethod
+    def from_circuits(cls, circuits, qubits=None, engine='native', device='CPU'):
+        # Simulate each independent sub-circuit once; each is preflighted on its own width
+        from one_pass_simulation import final_statevector
+
+        return cls([final_statevector(qc, engine, device) for qc in circuits], qubits)
+
+    def _local_indices(self, outcomes):
+        # Global integer outcomes -> one array of local indices per factor
+        outcomes = np.asarray(outcomes, dtype=np.uint64)
+        local = []
+        for _, qubits in self.factors:
+            index = np.zeros(outcomes.size, dtype=np.uint64)
+            for j, q in enumerate(qubits):
+                index |= ((outcomes >> np.uint64(q)) & np.uint64(1)) << np.uint64(j)
+            local.append(index)
+        return local
+
+    def amplitudes(self, outcomes):
+        # <outcome|psi> for integer outcomes (n <= 64) as the product of one lookup per factor
+        values = np.ones(np.asarray(outcomes).size, dtype=complex)
+        for (psi, _), index in zip(self.factors, self._local_indices(outcomes)):
+            values *= psi[index.astype(np.intp)]
+        return values
+
+    def amplitude(self, outcome):
+        # Accepts a qiskit bitstring (qubit 0 rightmost, any width) or an integer index
+        if isinstance(outcome, str):
+            bits = outcome.replace(' ', '')[::-1]
+            value = 1 + 0j
+            for psi, qubits in self.factors:
+                value *= psi[sum(int(bits[q]) << j for j, q in enumerate(qubits))]
+            return complex(value)
+        return complex(self.amplitudes([outcome])[0])
+
+    def expectation_pauli(self, label):
+        # <psi|P|psi> for a qiskit Pauli label (rightmost character is qubit 0), factor by factor.
+        # P|i> = i^(#Y) (-1)^popcount(i & z) |i ^ x>, so each factor costs one gather and one dot product
+        label = label[::-1]
+        if len(label) != self.num_qubits:
+            raise ValueError(f"Pauli label has {len(label)} qubits, the state {self.num_qubits}")
+        value = 1 + 0j
+        for psi, qubits in self.factors:
+            x = sum(1 << j for j, q in enumerate(qubits) if label[q] in 'XY')
+            z = sum(1 << j for j, q in enumerate(qubits) if label[q] in 'ZY')
+            if not x and not z:
+                continue
+            ys = sum(1 for q in qubits if label[q] == 'Y')
+            index = np.arange(psi.size, dtype=np.uint64)
+            signs = 1 - 2 * _parity(index, z) if z else 1
+            value *= 1j ** ys * np.vdot(psi[(index ^ np.uint64(x)).astype(np.intp)], psi * signs)
+        return value.real if abs(value.imag) < 1e-12 else value
+
+    def norm(self):
+        return float(np.prod([np.linalg.norm(psi) for psi, _ in self.factors]))
+
+    def distribution(self):
+        # |psi|^2 kept factored; cached, since marginals and sampling both start from it
+        if self._distribution is None:
+            self._distribution = ProductDistribution.from_statevectors([psi for psi, _ in self.factors],
+                                                                       [qubits for _, qubits in self.factors])
+        return self._distribution
+
+    def probabilities(self, qubits=None):
+        # Marginal probabilities of `qubits` (qubits[j] is bit j), like Statevector.probabilities(qubits)
+        return self.distribution().marginal(list(range(self.num_qubits)) if qubits is None else qubits)
+
+    def sample_counts(self, shots, seed=None):
+        # qiskit-style {'bitstring': count} for any width, ready for write_data_to_csv()
+        counts = self.distribution().sample_counts(shots, seed)
+        return counts.to_dict() if self.num_qubits <= 64 else counts
+
+    def to_statevector(self):
+        # Dense vector for small states only: np.kron with the highest factor first
+        dense = np.ones(1, dtype=complex)
+        for psi, qubits in self.factors:
+            if qubits != list(range(int(dense.size).bit_length() - 1, int(dense.size).bit_length() - 1 + len(qubits))):
+                raise ValueError("to_statevector() needs factors on consecutive qubits, lowest first")
+            dense = np.kron(psi, dense)
+        return dense
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+    from one_pass_simulation import write_data_to_csv
+
+    parser = argparse.ArgumentParser(description="Simulate independent halves and analyse their product state.")
+    parser.add_argument('--qubits', type=int, default=20, help="Qubits per half.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Number of sampled shots.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for shot sampling.")
+    parser.add_argument('--pauli', default=None, help="Pauli label over all qubits, qubit 0 rightmost.")
+    parser.add_argument('--csv', default=None, help="Write sampled Result,Count rows to this CSV file.")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    state = FactoredStatevector.from_circuits([generate_data(args.qubits), generate_data(args.qubits)])
+    print(f"{state.num_qubits}-qubit product state in {time.perf_counter() - start:.2f} s")
+    print(f"<0|psi> = {state.amplitude(0):.3e}, marginal of qubits 0 and {state.num_qubits - 1}: "
+          f"{np.round(state.probabilities([0, state.num_qubits - 1]), 4)}")
+    label = args.pauli or 'Z' * state.num_qubits
+    print(f"<{label if len(label) <= 16 else label[:8] + '...' + label[-8:]}> = {state.expectation_pauli(label):.6f}")
+
+    start = time.perf_counter()
+    counts = state.sample_counts(args.shots, args.seed)
+    print(f"Sampled {args.shots} shots ({len(counts)} outcomes) in {time.perf_counter() - start:.2f} s")
+    if args.csv:
+        write_data_to_csv(counts, None, args.csv)
@@ -0,0 +1,106 @@
+import argparse
+import os
+import time
+from counts import Counts
+from repetition import iteration_seed, prepare_simulator, simulate_counts
+
+def fragment_memory(circuits, method='statevector', bytes_per_amplitude=16):
+    # Estimated peak memory of the largest fragment
+    from planner import analyze_circuit, estimate
+
+    return max(estimate(analyze_circuit(qc), method, bytes_per_amplitude)[0] for qc in circuits)
+
+def concurrent_workers(circuits, workers=None, method='statevector', memory=None):
+    # Processes that can run at once: no more than the cores, the fragments, or the memory budget allows
+    from planner import MEMORY_FRACTION, available_memory
+
+    workers = min(workers or os.cpu_count(), len(circuits))
+    budget = (memory or available_memory()) * MEMORY_FRACTION
+    fitting = budget / fragment_memory(circuits, method)
+    if fitting < 1:
+        raise MemoryError(f"a single fragment needs more than the {budget / 1024 ** 3:.1f} GiB budget")
+    return max(1, min(workers, int(fitting)))
+
+def _run_fragment(index, qc, shots, seed, method, device, threads):
+    start = time.perf_counter()
+    simulator, compiled_circuit = prepare_simulator(qc, device, threads, method)
+    counts = simulate_counts(simulator, compiled_circuit, qc.num_qubits, shots, seed)
+    return index, counts, time.perf_counter() - start, os.getpid()
+
+def iter_fragments(circuits, shots=1000000, master_seed=None, workers=None, method='statevector', device='CPU',
+                   memory=None):
+    # Yields (index, Counts, seconds) as each fragment finishes, so reconstruction can start on the first one.
+    # Each fragment runs in its own process with cores / workers threads; seeds follow iteration_seed()
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    workers = concurrent_workers(circuits, workers, method, memory)
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    seeds = [None if master_seed is None else iteration_seed(master_seed, i) for i in range(len(circuits))]
+    with ProcessPoolExecutor(workers) as pool:
+        futures = [pool.submit(_run_fragment, i, qc, shots, seeds[i], method, device, threads)
+                   for i, qc in enumerate(circuits)]
+        for future in as_completed(futures):
+            index, counts, elapsed, pid = future.result()
+            print(f"Fragment {index}: {elapsed:.2f} s (worker {pid})")
+            yield index, counts, elapsed
+
+def run_batch(circuits, shots=1000000, master_seed=None, workers=None, method='statevector', device='CPU',
+              memory=None):
+    # One Aer job over all fragments with max_parallel_experiments; results arrive together at the end
+    from qiskit import transpile
+    from planner import make_simulator, preflight
+
+    parallel = concurrent_workers(circuits, workers, method, memory)
+    simulator = make_simulator(preflight(max(circuits, key=lambda qc: qc.num_qubits), method), device)
+    simulator.set_options(max_parallel_experiments=parallel, max_parallel_threads=0)
+    start = time.perf_counter()
+    compiled = transpile(circuits, simulator)
+    seed = None if master_seed is None else iteration_seed(master_seed, 0)
+    result = simulator.run(compiled, shots=shots, seed_simulator=seed).result()
+    elapsed = time.perf_counter() - start
+    print(f"Batch of {len(circuits)} fragments, {parallel} at a time: {elapsed:.2f} s")
+    return [Counts.from_dict(result.get_counts(i), qc.num_qubits) for i, qc in enumerate(circuits)]
+
+def run_fragments(circuits, shots=1000000, master_seed=None, workers=None, method='statevector', device='CPU',
+                  memory=None, batch=False, on_result=None):
+    # Counts of every fragment in input order; on_result(index, counts) is called as each one is ready
+    if batch:
+        results = run_batch(circuits, shots, master_seed, workers, method, device, memory)
+        if on_result is not None:
+            for index, counts in enumerate(results):
+                on_result(index, counts)
+        return results
+    results = [None] * len(circuits)
+    for index, counts, _ in iter_fragments(circuits, shots, master_seed, workers, method, device, memory):
+        results[index] = counts
+        if on_result is not None:
+            on_result(index, counts)
+    return results
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+    from results_store import write_counts
+
+    parser = argparse.ArgumentParser(description="Simulate independent circuit fragments concurrently.")
+    parser.add_argument('--fragments', type=int, default=2, help="Number of fragments.")
+    parser.add_argument('--qubits', type=int, default=20, help="Qubits per fragment.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Shots per fragment.")
+    parser.add_argument('--seed', type=int, default=None, help="Master seed of the fragment seeds.")
+    parser.add_argument('--workers', type=int, default=None, help="Fragments running at once (default: all cores).")
+    parser.add_argument('--batch', action='store_true', help="One Aer job with max_parallel_experiments instead.")
+    parser.add_argument('--out', default=None, help="Per-fragment output pattern with {i}, e.g. csv_files6/part_{i}.npz.")
+
+    args = parser.parse_args()
+
+    circuits = [generate_data(args.qubits, args.layers) for _ in range(args.fragments)]
+    print(f"Running {args.fragments} fragments on up to {concurrent_workers(circuits, args.workers)} workers")
+
+    def save(index, counts):
+        if args.out:
+            write_counts(counts, args.out.format(i=index), fragment=index, shots=args.shots)
+
+    start = time.perf_counter()
+    results = run_fragments(circuits, args.shots, args.seed, args.workers, batch=args.batch, on_result=save)
+    print(f"All fragments done in {time.perf_counter() - start:.2f} s, "
+          f"{', '.join(str(len(counts)) for counts in results)} outcomes")
@@ -0,0 +1,112 @@
+import argparse
+import numpy as np
+from qiskit import QuantumCircuit
+from qiskit.circuit.library import UnitaryGate
+from statevec_engine import brickwork_ops, circuit_to_ops
+
+def _embed(matrix, qubits, target_qubits):
+    # Expand a gate on `qubits` to the qiskit-ordered space of `target_qubits`
+    if tuple(qubits) == tuple(target_qubits):
+        return matrix
+    if len(qubits) == 1:
+        identity = np.eye(2, dtype=complex)
+        if qubits[0] == target_qubits[0]:
+            return np.kron(identity, matrix)
+        return np.kron(matrix, identity)
+    # Same pair, swapped order
+    swap = np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+    return swap @ matrix @ swap
+
+def fuse_ops(ops):
+    # Fold single-qubit gates into the neighbouring two-qubit gate on the same qubit,
+    # and merge back-to-back two-qubit gates on the same pair
+    fused = []
+    pending = {}
+    last = {}
+
+    for qubits, matrix in ops:
+        if len(qubits) == 1:
+            qubit = qubits[0]
+            pending[qubit] = matrix @ pending.get(qubit, np.eye(2, dtype=complex))
+            continue
+
+        if len(qubits) != 2:
+            # Wider gates are passed through; flush whatever is pending on their qubits
+            for qubit in qubits:
+                if qubit in pending:
+                    fused.append(((qubit,), pending.pop(qubit)))
+            for qubit in qubits:
+                last[qubit] = len(fused)
+            fused.append((tuple(qubits), matrix))
+            continue
+
+        unitary = matrix
+        for qubit in qubits:
+            if qubit in pending:
+                unitary = unitary @ _embed(pending.pop(qubit), (qubit,), qubits)
+
+        previous = last.get(qubits[0])
+        if previous is not None and previous == last.get(qubits[1]) and set(fused[previous][0]) == set(qubits):
+            # Same pair as the last gate on both qubits: multiply into it
+            prev_qubits, prev_matrix = fused[previous]
+            fused[previous] = (prev_qubits, _embed(unitary, qubits, prev_qubits) @ prev_matrix)
+            continue
+
+        last[qubits[0]] = last[qubits[1]] = len(fused)
+        fused.append((tuple(qubits), unitary))
+
+    # Trailing single-qubit gates go into the last gate on their qubit, or stay on their own
+    for qubit, matrix in pending.items():
+        index = last.get(qubit)
+        if index is None or len(fused[index][0]) != 2:
+            fused.append(((qubit,), matrix))
+        else:
+            target_qubits, target = fused[index]
+            fused[index] = (target_qubits, _embed(matrix, (qubit,), target_qubits) @ target)
+
+    return fused
+
+def fuse_brickwork(num_qubits, single_qubit_gates=None, two_qubit_gates=None, num_layers=7, angle_first=True):
+    # Fused op list for the generate_data() gate tables, ready for statevec_engine.apply_ops()
+    return fuse_ops(brickwork_ops(num_qubits, single_qubit_gates, two_qubit_gates, num_layers, angle_first))
+
+def fuse_circuit(qc):
+    # QuantumCircuit -> QuantumCircuit pass: fused gates become UnitaryGates, measurements stay put
+    fused_circuit = QuantumCircuit(*qc.qregs, *qc.cregs)
+    segment = QuantumCircuit(qc.num_qubits)
+
+    def flush():
+        for qubits, matrix in fuse_ops(circuit_to_ops(segment)):
+            fused_circuit.append(UnitaryGate(matrix, check_input=False), [fused_circuit.qubits[q] for q in qubits])
+        segment.data.clear()
+
+    for instruction in qc.data:
+        operation = instruction.operation
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        if operation.name not in ('measure', 'barrier', 'reset') and not instruction.clbits and len(qubits) <= 2:
+            segment.append(operation, qubits)
+            continue
+        flush()
+        fused_circuit.append(operation, instruction.qubits, instruction.clbits)
+    flush()
+
+    return fused_circuit
+
+def fusion_report(ops, fused):
+    # Each op is one full pass over the statevector
+    before = len(ops)
+    after = len(fused)
+    print(f"Statevector passes before fusion: {before}")
+    print(f"Statevector passes after fusion:  {after} ({before / max(after, 1):.1f}x fewer)")
+    return {'before': before, 'after': after}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Fuse the brickwork layers into per-pair two-qubit unitaries.")
+    parser.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+
+    args = parser.parse_args()
+
+    ops = brickwork_ops(args.qubits, num_layers=args.layers)
+    fused = fuse_ops(ops)
+    fusion_report(ops, fused)
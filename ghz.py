@@ -1,6 +1,7 @@
 from qiskit import QuantumCircuit, transpile
 
 from qiskit_aer import Aer
+from stabilizer_engine import is_clifford, run_stabilizer
 
 def create_ghz_circuit(n_qubits):
     circuit = QuantumCircuit(n_qubits)
@@ -9,12 +10,18 @@ def create_ghz_circuit(n_qubits):
         circuit.cx(qubit, qubit + 1)
     return circuit
 
-simulator = Aer.get_backend('aer_simulator_statevector')
 circuit = create_ghz_circuit(n_qubits=30)
 circuit.measure_all()
-circuit = transpile(circuit, simulator)
-job = simulator.run(circuit)
-result = job.result()
 
-print(result.get_counts())
-print(f'backend: {result.backend_name}')
+# H + cx is Clifford: the stabilizer tableau samples it at any width, the statevector stops near 33 qubits
+if is_clifford(circuit):
+    print(run_stabilizer(circuit, shots=1024))
+    print('backend: native stabilizer')
+else:
+    simulator = Aer.get_backend('aer_simulator_statevector')
+    circuit = transpile(circuit, simulator)
+    job = simulator.run(circuit)
+    result = job.result()
+
+    print(result.get_counts())
+    print(f'backend: {result.backend_name}')
@@ -0,0 +1,133 @@
+import argparse
+import os
+import time
+import numpy as np
+
+# Widest light-cone circuit simulated as one statevector; requests are grouped up to this width
+MAX_CONE_QUBITS = 24
+
+def light_cone(qc, qubits):
+    # Backward light cone of `qubits`: (sorted cone qubits, indices of the gates that can influence them)
+    cone = set(qubits)
+    gates = []
+    for index in range(len(qc.data) - 1, -1, -1):
+        instruction = qc.data[index]
+        if instruction.operation.name in ('measure', 'barrier'):
+            continue
+        touched = {qc.find_bit(q).index for q in instruction.qubits}
+        if touched & cone:
+            cone |= touched
+            gates.append(index)
+    return sorted(cone), gates[::-1]
+
+def cone_circuit(qc, qubits):
+    # The causally relevant gates of `qubits` on the cone's qubits; local qubit j is cone[j]
+    from qiskit import QuantumCircuit
+
+    cone, gates = light_cone(qc, qubits)
+    local = {q: j for j, q in enumerate(cone)}
+    sub = QuantumCircuit(len(cone))
+    for index in gates:
+        instruction = qc.data[index]
+        sub.append(instruction.operation, [local[qc.find_bit(q).index] for q in instruction.qubits])
+    return sub, cone
+
+def group_requests(qc, requests, max_qubits=MAX_CONE_QUBITS):
+    # Greedily pack requests into shared simulations while the joint cone costs no more than simulating
+    # them apart (2^|union| <= 2^|group| + 2^|cone|), and never wider than max_qubits
+    cones = [light_cone(qc, qubits)[0] for qubits in requests]
+    order = sorted(range(len(requests)), key=lambda i: cones[i])
+    groups = []
+    for i in order:
+        if len(cones[i]) > max_qubits:
+            raise MemoryError(f"the light cone of qubits {list(requests[i])} spans {len(cones[i])} qubits, "
+                              f"more than {max_qubits}")
+        width = len(groups[-1][0] | set(cones[i])) if groups else max_qubits + 1
+        if width <= max_qubits and 2 ** width <= 2 ** len(groups[-1][0]) + 2 ** len(cones[i]):
+            groups[-1][0].update(cones[i])
+            groups[-1][1].append(i)
+        else:
+            groups.append((set(cones[i]), [i]))
+    return [(sorted(qubits), members) for qubits, members in groups]
+
+def _marginal(probs, width, positions):
+    # Marginal of local qubits `positions` (positions[j] becomes bit j) from a 2^width probability vector
+    tensor = probs.reshape([2] * width)
+    # Axis a of the tensor holds local qubit width - 1 - a
+    keep = [width - 1 - p for p in positions]
+    summed = tensor.sum(axis=tuple(a for a in range(width) if a not in keep))
+    remaining = sorted(keep)
+    return summed.transpose([remaining.index(a) for a in keep[::-1]]).ravel()
+
+def _simulate_group(qc, requests):
+    # One statevector for the joint light cone of a group, then every request of the group from it.
+    # The cone of several qubit sets is the union of their cones, so its width is what grouping checked
+    from factored_statevector import FactoredStatevector
+    from one_pass_simulation import final_statevector
+    from shot_sampler import probabilities
+
+    sub, cone = cone_circuit(qc, sorted({q for qubits, _ in requests for q in qubits}))
+    psi = final_statevector(sub)
+    probs = probabilities(psi)
+    local = {q: j for j, q in enumerate(cone)}
+    results = []
+    for qubits, pauli in requests:
+        if pauli is None:
+            results.append(_marginal(probs, len(cone), [local[q] for q in qubits]))
+        else:
+            label = ''.join(pauli.get(q, 'I') for q in reversed(cone))
+            results.append(FactoredStatevector([psi]).expectation_pauli(label))
+    return results
+
+def _run(qc, requests, max_qubits, workers):
+    groups = group_requests(qc, [qubits for qubits, _ in requests], max_qubits)
+    results = [None] * len(requests)
+    workers = min(workers or os.cpu_count(), len(groups))
+    if workers <= 1:
+        for _, members in groups:
+            for i, value in zip(members, _simulate_group(qc, [requests[i] for i in members])):
+                results[i] = value
+        return results
+
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    # Each group is a small independent circuit, so only it and a few marginals cross process boundaries
+    with ProcessPoolExecutor(workers) as pool:
+        futures = {pool.submit(_simulate_group, qc, [requests[i] for i in members]): members
+                   for _, members in groups}
+        for future in as_completed(futures):
+            for i, value in zip(futures[future], future.result()):
+                results[i] = value
+    return results
+
+def local_marginals(qc, qubit_sets, max_qubits=MAX_CONE_QUBITS, workers=None):
+    # Exact marginal of each qubit set (qubits[j] is bit j), from light-cone circuits instead of the full state
+    return _run(qc, [(list(qubits), None) for qubits in qubit_sets], max_qubits, workers)
+
+def local_expectations(qc, paulis, max_qubits=MAX_CONE_QUBITS, workers=None):
+    # Exact <P> for each Pauli given as {qubit: 'X' | 'Y' | 'Z'}
+    return _run(qc, [(sorted(pauli), pauli) for pauli in paulis], max_qubits, workers)
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+
+    parser = argparse.ArgumentParser(description="Exact local marginals of the brickwork from light-cone circuits.")
+    parser.add_argument('--qubits', type=int, default=60, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--pairs', action='store_true', help="Neighbouring-pair marginals instead of single qubits.")
+    parser.add_argument('--max-qubits', type=int, default=MAX_CONE_QUBITS, help="Widest grouped light cone.")
+    parser.add_argument('--workers', type=int, default=None, help="Light-cone groups simulated at once.")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits, args.layers, measure=False)
+    qubit_sets = [[q, q + 1] for q in range(args.qubits - 1)] if args.pairs else [[q] for q in range(args.qubits)]
+    widest = max(len(light_cone(qc, qubits)[0]) for qubits in qubit_sets)
+    groups = group_requests(qc, qubit_sets, args.max_qubits)
+    print(f"{len(qubit_sets)} qubit sets, widest light cone {widest} qubits, {len(groups)} simulations")
+
+    start = time.perf_counter()
+    marginals = local_marginals(qc, qubit_sets, args.max_qubits, args.workers)
+    print(f"Computed in {time.perf_counter() - start:.2f} s")
+    for qubits, marginal in list(zip(qubit_sets, marginals))[:4]:
+        print(f"  qubits {qubits}: {np.round(marginal, 4)}")
@@ -0,0 +1,250 @@
+import argparse
+import time
+import numpy as np
+from statevec_engine import brickwork_ops, gate_matrix
+
+# Shots sampled together; each carries a (bond,) environment vector through the chain
+SHOT_CHUNK = 1 << 14
+# Product segments up to this many qubits are sampled from their dense distribution in one draw
+DENSE_QUBITS = 16
+
+SWAP = gate_matrix('swap')
+
+class MPS:
+    """Matrix product state over qubits 0..n-1 left to right, one (left, 2, right) tensor per qubit.
+
+    Two-qubit gates must act on neighbours (i, i+1). The orthogonality centre is moved
+    to the gate with QR sweeps, so every SVD truncation is optimal and the discarded
+    weight adds up in truncation_error.
+    """
+
+    def __init__(self, num_qubits, max_bond=None, cutoff=1e-12):
+        self.num_qubits = num_qubits
+        self.max_bond = max_bond
+        self.cutoff = cutoff
+        self.tensors = []
+        for _ in range(num_qubits):
+            tensor = np.zeros((1, 2, 1), dtype=complex)
+            tensor[0, 0, 0] = 1
+            self.tensors.append(tensor)
+        self.center = 0
+        self.truncation_error = 0.0
+
+    def _move_center(self, site):
+        while self.center < site:
+            k = self.center
+            left, _, right = self.tensors[k].shape
+            q, r = np.linalg.qr(self.tensors[k].reshape(left * 2, right))
+            self.tensors[k] = q.reshape(left, 2, -1)
+            self.tensors[k + 1] = np.tensordot(r, self.tensors[k + 1], axes=(1, 0))
+            self.center += 1
+        while self.center > site:
+            k = self.center
+            left, _, right = self.tensors[k].shape
+            q, r = np.linalg.qr(self.tensors[k].reshape(left, 2 * right).T)
+            self.tensors[k] = q.T.reshape(-1, 2, right)
+            self.tensors[k - 1] = np.tensordot(self.tensors[k - 1], r.T, axes=(2, 0))
+            self.center -= 1
+
+    def apply_single(self, qubit, matrix):
+        # A unitary on the physical index keeps the canonical form intact
+        self.tensors[qubit] = np.einsum('ab,lbr->lar', matrix, self.tensors[qubit])
+
+    def apply_pair(self, qubits, matrix):
+        a, b = qubits
+        if abs(a - b) != 1:
+            raise ValueError(f"MPS gates must act on neighbouring qubits, got {qubits}")
+        if a > b:
+            # Re-express the gate with the lower qubit as the low bit
+            matrix = SWAP @ matrix @ SWAP
+            a, b = b, a
+        self._move_center(a)
+        theta = np.einsum('lir,rjs->lijs', self.tensors[a], self.tensors[b])
+        # Little-endian: the row index is bit_a + 2 bit_b, so the reshaped axes are (out_b, out_a, in_b, in_a)
+        theta = np.einsum('abcd,ldcs->lbas', matrix.reshape(2, 2, 2, 2), theta)
+        left, _, _, right = theta.shape
+        u, s, vh = np.linalg.svd(theta.reshape(left * 2, 2 * right), full_matrices=False)
+
+        # Keep the fewest singular values whose discarded weight stays below cutoff
+        weights = s ** 2
+        total = weights.sum()
+        tail = np.cumsum(weights[::-1])[::-1]
+        keep = max(int(np.count_nonzero(tail > self.cutoff * total)), 1)
+        if self.max_bond is not None:
+            keep = min(keep, self.max_bond)
+        discarded = total - weights[:keep].sum()
+        self.truncation_error += discarded / total
+        s = s[:keep] * np.sqrt(total / (total - discarded))
+
+        self.tensors[a] = u[:, :keep].reshape(left, 2, keep)
+        self.tensors[b] = (s[:, None] * vh[:keep]).reshape(keep, 2, right)
+        self.center = b
+
+    def apply_ops(self, ops):
+        for qubits, matrix in ops:
+            if len(qubits) == 1:
+                self.apply_single(qubits[0], matrix)
+            elif len(qubits) == 2:
+                self.apply_pair(qubits, matrix)
+            else:
+                raise ValueError(f"MPS supports one- and two-qubit gates, got {len(qubits)} qubits")
+        return self
+
+    def bond_dimensions(self):
+        return [tensor.shape[2] for tensor in self.tensors[:-1]]
+
+    def norm(self):
+        return float(np.linalg.norm(self.tensors[self.center]))
+
+    def amplitudes(self, bits):
+        # <bits|psi> for rows of 0/1 where column k is qubit k
+        bits = np.atleast_2d(np.asarray(bits, dtype=np.intp))
+        env = np.ones((bits.shape[0], 1), dtype=complex)
+        for k, tensor in enumerate(self.tensors):
+            env = np.einsum('bl,lbr->br', env, tensor[:, bits[:, k], :])
+        return env[:, 0]
+
+    def amplitude(self, outcome):
+        # Accepts a qiskit bitstring (qubit 0 rightmost) or an integer index
+        if isinstance(outcome, str):
+            bits = [int(c) for c in reversed(outcome.replace(' ', ''))]
+        else:
+            bits = [(int(outcome) >> k) & 1 for k in range(self.num_qubits)]
+        return complex(self.amplitudes([bits])[0])
+
+    def to_statevector(self, start=0, stop=None):
+        # Dense vector of qubits start..stop-1 in qiskit order; a slice is only a state between bond-1 cuts
+        stop = self.num_qubits if stop is None else stop
+        psi = np.ones((1, self.tensors[start].shape[0]), dtype=complex)
+        for tensor in self.tensors[start:stop]:
+            # New qubit becomes the highest bit so far
+            psi = np.einsum('il,lsr->sir', psi, tensor).reshape(-1, tensor.shape[2])
+        return psi[:, 0]
+
+    def segments(self):
+        # Runs of qubits separated by bond dimension 1: the state is a product of these pieces
+        cuts = [k + 1 for k, bond in enumerate(self.bond_dimensions()) if bond == 1]
+        edges = [0] + cuts + [self.num_qubits]
+        return list(zip(edges[:-1], edges[1:]))
+
+    def iter_samples(self, shots, seed=None):
+        # Yields (count, n) uint8 bit rows, column k being qubit k, in chunks of SHOT_CHUNK.
+        # Product segments are independent: small ones are drawn from their dense distribution,
+        # longer ones by perfect sampling, one qubit at a time from its exact conditional
+        self._move_center(0)
+        rng = np.random.default_rng(seed)
+        dense = {}
+        for lo, hi in self.segments():
+            if hi - lo <= DENSE_QUBITS:
+                probs = self.to_statevector(lo, hi)
+                dense[lo] = np.cumsum(probs.real ** 2 + probs.imag ** 2)
+
+        for start in range(0, shots, SHOT_CHUNK):
+            count = min(SHOT_CHUNK, shots - start)
+            bits = np.empty((count, self.num_qubits), dtype=np.uint8)
+            for lo, hi in self.segments():
+                if lo in dense:
+                    cumulative = dense[lo]
+                    local = np.searchsorted(cumulative, rng.random(count) * cumulative[-1], side='right')
+                    local = np.minimum(local, cumulative.size - 1)
+                    bits[:, lo:hi] = (local[:, None] >> np.arange(hi - lo)) & 1
+                else:
+                    bits[:, lo:hi] = self._sample_chain(lo, hi, count, rng)
+            yield bits
+
+    def _sample_chain(self, lo, hi, count, rng):
+        # With the centre left of lo every right environment is the identity, so the squared norm of
+        # each branch is the exact conditional probability of that qubit value
+        bits = np.empty((count, hi - lo), dtype=np.uint8)
+        env = np.ones((count, 1), dtype=complex)
+        for k in range(lo, hi):
+            tensor = self.tensors[k]
+            zero, one = env @ tensor[:, 0, :], env @ tensor[:, 1, :]
+            flat_zero, flat_one = zero.view(np.float64), one.view(np.float64)
+            p_zero = np.einsum('ij,ij->i', flat_zero, flat_zero)
+            p_one = np.einsum('ij,ij->i', flat_one, flat_one)
+            outcome = rng.random(count) * (p_zero + p_one) >= p_zero
+            bits[:, k - lo] = outcome
+            env = np.where(outcome[:, None], one, zero)
+            env *= (1 / np.sqrt(np.where(outcome, p_one, p_zero)))[:, None]
+        return bits
+
+    def sample_bits(self, shots, seed=None):
+        chunks = list(self.iter_samples(shots, seed))
+        return np.concatenate(chunks) if chunks else np.empty((0, self.num_qubits), dtype=np.uint8)
+
+    def histogram(self, shots, seed=None):
+        # Sorted (outcomes, counts) as uint64 indices, like shot_sampler.sample_histogram; n <= 64
+        if self.num_qubits > 64:
+            raise ValueError("integer outcomes need at most 64 qubits; use sample_counts()")
+        from counts import _bits_to_indices
+        from shot_sampler import _sorted_histogram
+
+        parts = []
+        for bits in self.iter_samples(shots, seed):
+            parts.append(np.unique(_bits_to_indices(bits[:, ::-1]), return_counts=True))
+            if len(parts) > 8:
+                parts = [_sorted_histogram(parts)]
+        return _sorted_histogram(parts)
+
+    def sample_counts(self, shots, seed=None):
+        # qiskit-style {'bitstring': count}; works for any number of qubits
+        if self.num_qubits <= 64:
+            from shot_sampler import histogram_to_counts
+
+            return histogram_to_counts(*self.histogram(shots, seed), self.num_qubits)
+        # Wider outcomes are deduplicated as packed byte rows rather than with a slow row-wise unique
+        bits = self.sample_bits(shots, seed)[:, ::-1]
+        packed = np.ascontiguousarray(np.packbits(bits, axis=1))
+        _, first, counts = np.unique(packed.view(f'V{packed.shape[1]}').ravel(), return_index=True, return_counts=True)
+        strings = np.ascontiguousarray(bits[first] + ord('0')).view(f'S{self.num_qubits}').ravel()
+        return {s.decode(): int(c) for s, c in zip(strings, counts)}
+
+def run_mps_simulation(num_qubits=60, single_qubit_gates=None, two_qubit_gates=None, num_layers=7,
+                       angle_first=True, max_bond=None, cutoff=1e-12):
+    # MPS counterpart of run_native_simulation(): same gate tables, any width
+    ops = brickwork_ops(num_qubits, single_qubit_gates, two_qubit_gates, num_layers, angle_first)
+    return MPS(num_qubits, max_bond, cutoff).apply_ops(ops)
+
+def circuit_to_mps(qc, max_bond=None, cutoff=1e-12):
+    from statevec_engine import circuit_to_ops
+
+    return MPS(qc.num_qubits, max_bond, cutoff).apply_ops(circuit_to_ops(qc))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the brickwork circuit as a matrix product state.")
+    parser.add_argument('--qubits', type=int, default=60, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Number of sampled shots.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for shot sampling.")
+    parser.add_argument('--max-bond', type=int, default=None, help="Largest bond dimension kept (default: exact).")
+    parser.add_argument('--csv', default=None, help="Write Result,Count rows to this CSV file.")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    mps = run_mps_simulation(args.qubits, num_layers=args.layers, max_bond=args.max_bond)
+    print(f"MPS: {args.qubits} qubits in {time.perf_counter() - start:.2f} s, max bond {max(mps.bond_dimensions())}, "
+          f"truncation error {mps.truncation_error:.2e}")
+
+    start = time.perf_counter()
+    if args.qubits <= 64:
+        from counts import Counts
+
+        counts = Counts(*mps.histogram(args.shots, args.seed), args.qubits, presorted=True)
+    else:
+        counts = mps.sample_counts(args.shots, args.seed)
+    print(f"Sampled {args.shots} shots ({len(counts)} outcomes) in {time.perf_counter() - start:.2f} s")
+
+    if args.csv and args.qubits <= 64:
+        counts.to_csv(args.csv)
+    elif args.csv:
+        import csv
+        import os
+
+        os.makedirs(os.path.dirname(args.csv) or '.', exist_ok=True)
+        with open(args.csv, 'w', newline='') as cf:
+            csv_writer = csv.writer(cf)
+            csv_writer.writerow(['Result', 'Count'])
+            for key, value in counts.items():
+                csv_writer.writerow([key, value])
@@ -0,0 +1,96 @@
+import argparse
+import csv
+import os
+import numpy as np
+from brickwork import generate_data
+from gate_fusion import fuse_ops
+from planner import preflight
+from shot_sampler import histogram_to_counts, probabilities, sample_histogram
+from statevec_engine import allocate_state, apply_ops, circuit_to_ops
+
+def final_statevector(qc, engine='native', device='CPU'):
+    # Compute the pre-measurement statevector exactly once, after checking it fits in memory
+    qc_no_measure = qc.remove_final_measurements(inplace=False)
+    preflight(qc_no_measure, 'statevector')
+
+    if engine == 'native':
+        psi = allocate_state(qc_no_measure.num_qubits)
+        return apply_ops(psi, qc_no_measure.num_qubits, fuse_ops(circuit_to_ops(qc_no_measure)))
+
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    qc_no_measure.save_statevector()
+    simulator = AerSimulator(method='statevector', device=device)
+    compiled_circuit = transpile(qc_no_measure, simulator, optimization_level=0)
+    result = simulator.run(compiled_circuit).result()
+    return np.asarray(result.get_statevector(compiled_circuit))
+
+def sample_counts(psi, shots, seed=None):
+    # Draw measurement outcomes from |psi|^2 instead of re-running the circuit
+    num_qubits = int(psi.size).bit_length() - 1
+    outcomes, counts = sample_histogram(probabilities(psi), shots, seed)
+    return histogram_to_counts(outcomes, counts, num_qubits)
+
+def run_single_pass(qc, shots=20000, seed=None, engine='native', device='CPU', decimals=3):
+    # One simulation gives both outputs of run_qiskit_simulation(): counts and the rounded psi
+    psi = final_statevector(qc, engine, device)
+    counts = sample_counts(psi, shots, seed)
+    # Rounded in place once the counts are drawn: no second 2^n complex array
+    return counts, np.round(psi, decimals, out=psi)
+
+def write_data_to_csv(counts, psi, csv_file):
+    if csv_file.endswith('.npz'):
+        # Binary counts through the shared store, the state vector beside them as .npy
+        from counts import Counts
+        from results_store import write_counts
+
+        write_counts(Counts.from_dict(counts), csv_file)
+        if psi is not None:
+            np.save(csv_file[:-len('.npz')] + '-statevector.npy', np.asarray(psi))
+        return
+
+    # Create directory if it doesn't exist
+    os.makedirs(os.path.dirname(csv_file) or '.', exist_ok=True)
+
+    with open(csv_file, 'w', newline='') as cf:
+        csv_writer = csv.writer(cf)
+        csv_writer.writerow(['Result', 'Count', 'State Vector'])
+
+        # Write counts data
+        for key, value in counts.items():
+            csv_writer.writerow([key, value, ''])
+
+        if psi is None:
+            return
+
+        # Write statevector data
+        csv_writer.writerow(['', '', ''])
+        csv_writer.writerow(['State Vector', '', ''])
+        for vector in psi:
+            csv_writer.writerow(['', '', vector])
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate once and write counts plus statevector to CSV.")
+    parser.add_argument('--csv', required=True, help="Path to the output CSV file, or .npz for binary counts "
+                                                     "with the state vector beside them.")
+    parser.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    parser.add_argument('--shots', type=int, default=20000, help="Number of sampled shots.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for shot sampling.")
+    parser.add_argument('--engine', default='native', choices=['native', 'aer'], help="Statevector engine.")
+    parser.add_argument('--device', default='CPU', help="Aer device when --engine aer is used.")
+    parser.add_argument('--statevector', default=None,
+                        help="Dump the full-precision statevector to this .npy file instead of CSV rows.")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits)
+    if args.statevector:
+        from statevector_store import dump_statevector
+
+        psi = final_statevector(qc, args.engine, args.device)
+        dump_statevector(psi, args.statevector)
+        write_data_to_csv(sample_counts(psi, args.shots, args.seed), None, args.csv)
+    else:
+        counts, psi = run_single_pass(qc, args.shots, args.seed, args.engine, args.device)
+        write_data_to_csv(counts, psi, args.csv)
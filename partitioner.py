@@ -0,0 +1,228 @@
+import argparse
+import math
+import time
+import numpy as np
+from planner import _statevector_cost, analyze_circuit, available_memory, format_bytes, format_seconds, MEMORY_FRACTION
+
+# Sampling overhead (gamma^2) of one cut: a cx-type gate cut has gamma 3, a wire cut gamma 4
+GATE_CUT_OVERHEAD = 9
+WIRE_CUT_OVERHEAD = 16
+
+def max_fragment_qubits(memory=None, bytes_per_amplitude=16):
+    # Widest statevector fragment that fits the memory budget
+    budget = (memory or available_memory()) * MEMORY_FRACTION
+    return int(math.floor(math.log2(budget / bytes_per_amplitude)))
+
+def weight_matrix(num_qubits, edges):
+    # Dense symmetric matrix of two-qubit gate counts between qubit pairs
+    weights = np.zeros((num_qubits, num_qubits), dtype=np.int64)
+    for (a, b), count in edges.items():
+        weights[a, b] += count
+        weights[b, a] += count
+    return weights
+
+def qubit_order(weights):
+    # Reverse Cuthill-McKee: a linear order that keeps interacting qubits close, so contiguous
+    # blocks of it make good fragments; a line of nearest-neighbour gates keeps its own order
+    n = weights.shape[0]
+    degree = np.count_nonzero(weights, axis=1)
+    if not np.triu(weights, 2).any():
+        return list(range(n))
+    order = []
+    seen = np.zeros(n, dtype=bool)
+    for root in sorted(range(n), key=lambda q: (degree[q], q)):
+        if seen[root]:
+            continue
+        seen[root] = True
+        queue = [root]
+        while queue:
+            q = queue.pop(0)
+            order.append(q)
+            neighbours = [int(p) for p in np.flatnonzero(weights[q]) if not seen[p]]
+            for p in sorted(neighbours, key=lambda p: (degree[p], p)):
+                seen[p] = True
+                queue.append(p)
+    return order[::-1]
+
+def _contiguous_split(weights, k, max_qubits):
+    # DP over the ordered qubits: best[m][j] is the fewest cut gates splitting the first j qubits into m
+    # fragments of at most max_qubits each. A block [i, j) pays for its gates to qubits at j or later
+    n = weights.shape[0]
+    upper = np.triu(weights, 1)
+    # table[i, j]: gates from qubits >= i to qubits >= j, as a 2D suffix sum
+    table = np.zeros((n + 1, n + 1), dtype=np.int64)
+    table[:n, :n] = upper
+    table = table[::-1].cumsum(axis=0)[::-1]
+    table = table[:, ::-1].cumsum(axis=1)[:, ::-1]
+
+    def leaving(i, j):
+        # Gates from [i, j) to [j, n)
+        return table[i, j] - table[j, j]
+
+    best = np.full((k + 1, n + 1), np.iinfo(np.int64).max // 2)
+    choice = np.zeros((k + 1, n + 1), dtype=np.int64)
+    best[0, 0] = 0
+    for m in range(1, k + 1):
+        for j in range(1, n + 1):
+            for i in range(max(j - max_qubits, 0), j):
+                cost = best[m - 1, i] + leaving(i, j)
+                if cost < best[m, j]:
+                    best[m, j] = cost
+                    choice[m, j] = i
+    if best[k, n] >= np.iinfo(np.int64).max // 2:
+        return None
+    bounds = [n]
+    for m in range(k, 0, -1):
+        bounds.append(int(choice[m, bounds[-1]]))
+    bounds = bounds[::-1]
+    return [list(range(bounds[m], bounds[m + 1])) for m in range(k)]
+
+def cut_gates(weights, labels):
+    # Gates whose qubits sit in different fragments
+    crossing = labels[:, None] != labels[None, :]
+    return int(np.triu(weights * crossing, 1).sum())
+
+def refine(weights, labels, max_qubits, passes=10):
+    # Kernighan-Lin style refinement: move single qubits or swap pairs between fragments while
+    # that removes cut gates and keeps every fragment within max_qubits
+    labels = labels.copy()
+    k = labels.max() + 1
+    for _ in range(passes):
+        # links[q, f]: gates between qubit q and fragment f
+        links = np.stack([weights[:, labels == f].sum(axis=1) for f in range(k)], axis=1)
+        sizes = np.bincount(labels, minlength=k)
+        own = links[np.arange(labels.size), labels]
+        gains = links - own[:, None]
+        best = (0, None)
+        for q in range(labels.size):
+            for f in range(k):
+                if f != labels[q] and sizes[f] < max_qubits and gains[q, f] > best[0]:
+                    best = (gains[q, f], (q, f))
+        if best[1] is not None:
+            q, f = best[1]
+            labels[q] = f
+            continue
+        # No single move helps or fits: take the best swap of two qubits in different fragments
+        swaps = gains[:, labels].T + gains[:, labels] - 2 * weights
+        swaps[labels[:, None] == labels[None, :]] = 0
+        a, b = np.unravel_index(np.argmax(swaps), swaps.shape)
+        if swaps[a, b] <= 0:
+            break
+        labels[a], labels[b] = labels[b], labels[a]
+    return labels
+
+def find_partition(qc, max_qubits=None, k=None, memory=None, bytes_per_amplitude=16):
+    # Fragments of at most max_qubits qubits with the fewest cut gates, as sorted qubit lists
+    info = analyze_circuit(qc)
+    n = info['num_qubits']
+    max_qubits = max_qubits or max_fragment_qubits(memory, bytes_per_amplitude)
+    components = info['components']
+    if k is None and all(len(c) <= max_qubits for c in components):
+        # Non-interacting blocks need no cut at all
+        return _summary(info, [list(c) for c in components], bytes_per_amplitude)
+
+    weights = weight_matrix(n, info['edges'])
+    order = qubit_order(weights)
+    reordered = weights[np.ix_(order, order)]
+    fewest = math.ceil(n / max_qubits)
+    best = None
+    for fragments in ([k] if k else range(fewest, min(fewest + 2, n) + 1)):
+        split = _contiguous_split(reordered, fragments, max_qubits)
+        if split is None:
+            continue
+        labels = np.empty(n, dtype=np.int64)
+        for f, block in enumerate(split):
+            labels[[order[i] for i in block]] = f
+        labels = refine(weights, labels, max_qubits)
+        cuts = cut_gates(weights, labels)
+        if best is None or cuts < best[0]:
+            best = (cuts, labels)
+    if best is None:
+        raise ValueError(f"{n} qubits do not fit in {k} fragments of at most {max_qubits} qubits")
+    labels = best[1]
+    fragments = [sorted(int(q) for q in np.flatnonzero(labels == f)) for f in range(labels.max() + 1)]
+    return _summary(info, [f for f in fragments if f], bytes_per_amplitude)
+
+def _summary(info, fragments, bytes_per_amplitude):
+    # Fragment qubit maps, the cut gates and the reconstruction cost of running the fragments 9^K times
+    fragment_of = {q: f for f, qubits in enumerate(fragments) for q in qubits}
+    cuts = [(a, b, count) for (a, b), count in sorted(info['edges'].items()) if fragment_of[a] != fragment_of[b]]
+    num_cuts = sum(count for _, _, count in cuts)
+    gates_per_qubit = info['num_gates'] / max(info['num_qubits'], 1)
+    costs = [_statevector_cost(len(f), gates_per_qubit * len(f), bytes_per_amplitude) for f in fragments]
+    overhead = GATE_CUT_OVERHEAD ** num_cuts
+    return {
+        'fragments': fragments,
+        'qubit_map': {q: (f, fragments[f].index(q)) for q, f in fragment_of.items()},
+        'cuts': cuts,
+        'num_cuts': num_cuts,
+        'memory': max(m for m, _ in costs),
+        'seconds': overhead * sum(s for _, s in costs),
+        'sampling_overhead': overhead,
+    }
+
+def fragment_qubits(qc, fragment):
+    # The Qubit objects of a fragment, as create_sub_circuit(full_circuit, qubits) expects them
+    return [qc.qubits[q] for q in fragment]
+
+def cut_comparison(qc, fragments):
+    # Space-like (gate) cuts against time-like (wire) cuts for the same fragments. Instead of cutting a
+    # crossing gate, one of its qubits can visit the other fragment: a wire cut before each run of
+    # consecutive crossing gates on that qubit and one after it
+    fragment_of = {q: f for f, qubits in enumerate(fragments) for q in qubits}
+    crossing = {}
+    sequences = {}
+    for instruction in qc.data:
+        qubits = [qc.find_bit(q).index for q in instruction.qubits]
+        if len(qubits) != 2:
+            continue
+        cut = fragment_of[qubits[0]] != fragment_of[qubits[1]]
+        for q in qubits:
+            sequences.setdefault(q, []).append(cut)
+        if cut:
+            pair = tuple(sorted(qubits))
+            crossing[pair] = crossing.get(pair, 0) + 1
+
+    def runs(q):
+        sequence = sequences[q]
+        return sum(1 for i, cut in enumerate(sequence) if cut and (i == 0 or not sequence[i - 1]))
+
+    # Every crossing pair needs one visiting qubit; take the endpoint with fewer runs
+    movers = {min(pair, key=lambda q: (runs(q), q)) for pair in crossing}
+    gate_cuts = sum(crossing.values())
+    wire_cuts = sum(2 * runs(q) for q in movers)
+    return {
+        'gate_cuts': gate_cuts,
+        'gate_overhead': GATE_CUT_OVERHEAD ** gate_cuts,
+        'wire_cuts': wire_cuts,
+        'wire_overhead': WIRE_CUT_OVERHEAD ** wire_cuts,
+    }
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+
+    parser = argparse.ArgumentParser(description="Split a circuit into fragments that fit in memory with the fewest cuts.")
+    parser.add_argument('--qubits', type=int, default=60, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--max-qubits', type=int, default=None, help="Widest fragment (default: from the memory budget).")
+    parser.add_argument('--fragments', type=int, default=None, help="Number of fragments (default: fewest that fit).")
+    parser.add_argument('--memory', type=float, default=None, help="Memory budget in GiB (default: available).")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits, args.layers)
+    start = time.perf_counter()
+    partition = find_partition(qc, args.max_qubits, args.fragments, args.memory and args.memory * 1024 ** 3)
+    print(f"Partitioned {args.qubits} qubits in {(time.perf_counter() - start) * 1e3:.1f} ms:")
+    for f, qubits in enumerate(partition['fragments']):
+        print(f"  fragment {f}: {len(qubits)} qubits {qubits[0]}..{qubits[-1]}" if qubits == list(range(qubits[0], qubits[-1] + 1))
+              else f"  fragment {f}: {len(qubits)} qubits {qubits}")
+    print(f"  {partition['num_cuts']} cut gates on pairs {[(a, b) for a, b, _ in partition['cuts']]}")
+    print(f"  {format_bytes(partition['memory'])} per fragment, {format_seconds(partition['seconds'])} "
+          f"with sampling overhead {partition['sampling_overhead']}x")
+    if len(partition['fragments']) == 2 and partition['num_cuts']:
+        print("  run it with circuit_cutting.CutCircuit(qc, partition=fragments[0])")
+
+    comparison = cut_comparison(qc, partition['fragments'])
+    print(f"Spatial (gate) cuts:   {comparison['gate_cuts']:>3} -> overhead {comparison['gate_overhead']:.3g}x")
+    print(f"Temporal (wire) cuts:  {comparison['wire_cuts']:>3} -> overhead {comparison['wire_overhead']:.3g}x")
@@ -0,0 +1,251 @@
+import argparse
+import math
+import os
+import time
+
+# Rough per-operation costs, calibrated on one CPU core against Aer (seconds)
+SECONDS_PER_AMPLITUDE_GATE = 3e-9
+SECONDS_PER_MPS_FLOP = 1e-9
+SECONDS_PER_TABLEAU_ROW_GATE = 2e-8
+# Fraction of the memory budget a plan may use; the rest is left for Python, qiskit and the outputs
+MEMORY_FRACTION = 0.8
+
+# Aer method names, plus 'partitioned' for independent or cut sub-circuits run one after another
+METHODS = ['statevector', 'density_matrix', 'matrix_product_state', 'stabilizer', 'partitioned']
+
+CLIFFORD_GATES = {'id', 'x', 'y', 'z', 'h', 's', 'sdg', 'sx', 'sxdg', 'cx', 'cy', 'cz', 'swap'}
+ROTATION_GATES = {'rx', 'ry', 'rz', 'p', 'u1'}
+# Largest Schmidt-rank growth of a two-qubit gate across a cut; unknown gates get the general bound
+GATE_SCHMIDT_RANK = {'cx': 2, 'cy': 2, 'cz': 2, 'cp': 2, 'crx': 2, 'cry': 2, 'crz': 2, 'rzz': 2, 'rxx': 2, 'ryy': 2}
+IGNORED = {'measure', 'barrier', 'reset', 'delay'}
+
+def available_memory():
+    # SLURM's per-node limit when running under a job, otherwise what the kernel reports as available
+    if os.environ.get('SLURM_MEM_PER_NODE'):
+        return int(os.environ['SLURM_MEM_PER_NODE']) * 1024 ** 2
+    try:
+        with open('/proc/meminfo') as f:
+            for line in f:
+                if line.startswith('MemAvailable:'):
+                    return int(line.split()[1]) * 1024
+    except OSError:
+        pass
+    return os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+
+def interaction_components(num_qubits, edges):
+    # Connected components of the interaction graph (union-find), each as a sorted qubit list
+    parent = list(range(num_qubits))
+
+    def find(q):
+        while parent[q] != q:
+            parent[q] = parent[parent[q]]
+            q = parent[q]
+        return q
+
+    for a, b in edges:
+        parent[find(a)] = find(b)
+    components = {}
+    for q in range(num_qubits):
+        components.setdefault(find(q), []).append(q)
+    return sorted(components.values())
+
+def _is_clifford(name, params):
+    if name in CLIFFORD_GATES:
+        return True
+    if name in ROTATION_GATES and len(params) == 1:
+        try:
+            return abs(math.remainder(float(params[0]), math.pi / 2)) < 1e-9
+        except TypeError:
+            return False
+    return False
+
+def analyze_circuit(qc):
+    # Width, depth, gate set and interaction graph: everything the estimates need, in one pass
+    num_qubits = qc.num_qubits
+    gates = {}
+    edges = {}
+    cut_bits = [0.0] * max(num_qubits - 1, 0)
+    clifford = True
+    wide = 0
+    for instruction in qc.data:
+        operation = instruction.operation
+        if operation.name in IGNORED:
+            continue
+        gates[operation.name] = gates.get(operation.name, 0) + 1
+        clifford = clifford and _is_clifford(operation.name, operation.params)
+        qubits = sorted(qc.find_bit(q).index for q in instruction.qubits)
+        if len(qubits) < 2:
+            continue
+        if len(qubits) > 2:
+            wide += 1
+        pair = (qubits[0], qubits[-1])
+        edges[pair] = edges.get(pair, 0) + 1
+        # Every cut between the gate's outermost qubits can grow its bond dimension by the gate's rank
+        rank = GATE_SCHMIDT_RANK.get(operation.name, 4 ** (len(qubits) // 2))
+        for cut in range(qubits[0], qubits[-1]):
+            cut_bits[cut] += math.log2(rank)
+    return {
+        'num_qubits': num_qubits,
+        'depth': qc.depth(lambda instruction: instruction.operation.name not in IGNORED),
+        'gates': gates,
+        'num_gates': sum(gates.values()),
+        'two_qubit_gates': sum(edges.values()),
+        'wide_gates': wide,
+        'clifford': clifford,
+        'edges': edges,
+        'components': interaction_components(num_qubits, edges),
+        'cut_bits': cut_bits,
+    }
+
+def _power_of_two(exponent):
+    # 2^exponent as a float; math.inf past the float range instead of an exact integer that overflows later
+    return math.ldexp(1.0, exponent) if exponent < 1024 else math.inf
+
+def _bond_dimensions(info):
+    # Upper bound on each MPS bond: limited by the gates across the cut and by the smaller side
+    n = info['num_qubits']
+    return [_power_of_two(math.ceil(min(bits, k + 1, n - k - 1))) for k, bits in enumerate(info['cut_bits'])]
+
+def _statevector_cost(num_qubits, num_gates, bytes_per_amplitude):
+    amplitudes = _power_of_two(num_qubits)
+    return amplitudes * bytes_per_amplitude, num_gates * amplitudes * SECONDS_PER_AMPLITUDE_GATE if num_gates else 0.0
+
+def estimate(info, method, bytes_per_amplitude=16):
+    # (memory bytes, seconds, note) of one method; math.inf marks a method that cannot run the circuit
+    n = info['num_qubits']
+    if method == 'statevector':
+        return _statevector_cost(n, info['num_gates'], bytes_per_amplitude) + ('',)
+    if method == 'density_matrix':
+        return _statevector_cost(2 * n, info['num_gates'], bytes_per_amplitude) + ('',)
+    if method == 'matrix_product_state':
+        if info['wide_gates']:
+            return math.inf, math.inf, 'gates on more than two qubits'
+        bonds = [1] + _bond_dimensions(info) + [1]
+        memory = sum(2 * bonds[k] * bonds[k + 1] for k in range(n)) * bytes_per_amplitude
+        seconds = 0.0
+        for (a, b), count in info['edges'].items():
+            # One SVD of a (2 chi) x (2 chi) matrix per gate, plus the swaps that bring the qubits together
+            chi = max(bonds[a + 1:b + 1])
+            seconds += count * (b - a) * (2 * chi) ** 3 * SECONDS_PER_MPS_FLOP
+        return memory, seconds, f"max bond {max(bonds):.0f}"
+    if method == 'stabilizer':
+        if not info['clifford']:
+            return math.inf, math.inf, 'non-Clifford gates'
+        return (2 * n + 1) * (2 * n + 1) // 8 + 1, info['num_gates'] * (2 * n) * SECONDS_PER_TABLEAU_ROW_GATE, ''
+    if method == 'partitioned':
+        return _partitioned_cost(info, bytes_per_amplitude)
+    raise ValueError(f"unknown simulation method '{method}'")
+
+def _partitioned_cost(info, bytes_per_amplitude):
+    # Independent components run one after another; a single connected circuit is cut once along the line
+    n = info['num_qubits']
+    gates_per_qubit = info['num_gates'] / max(n, 1)
+    components = info['components']
+    if len(components) > 1:
+        costs = [_statevector_cost(len(c), gates_per_qubit * len(c), bytes_per_amplitude) for c in components]
+        return max(m for m, _ in costs), sum(s for _, s in costs), f"{len(components)} components"
+
+    best = (math.inf, math.inf, 'no cut position')
+    for k in range(n - 1):
+        # Each two-qubit gate across the cut becomes 3 x 3 = 9 pairs of sub-circuit runs
+        cuts = sum(count for (a, b), count in info['edges'].items() if a <= k < b)
+        left = _statevector_cost(k + 1, gates_per_qubit * (k + 1), bytes_per_amplitude)
+        right = _statevector_cost(n - k - 1, gates_per_qubit * (n - k - 1), bytes_per_amplitude)
+        seconds = (9.0 ** cuts if cuts * math.log2(9) < 1024 else math.inf) * (left[1] + right[1])
+        if seconds < best[1]:
+            best = (max(left[0], right[0]), seconds, f"cut after qubit {k}, {cuts} gates cut")
+    return best
+
+def plan(qc, memory=None, max_seconds=None, methods=None, bytes_per_amplitude=16, verbose=True):
+    # Cheapest feasible method; raises MemoryError before anything is allocated when none fits
+    start = time.perf_counter()
+    info = analyze_circuit(qc)
+    budget = (memory or available_memory()) * MEMORY_FRACTION
+    candidates = methods or METHODS
+
+    estimates = []
+    for method in candidates:
+        memory_bytes, seconds, note = estimate(info, method, bytes_per_amplitude)
+        if math.isinf(seconds) and note:
+            reason = note
+        elif memory_bytes > budget:
+            reason = 'memory'
+        elif math.isinf(seconds) or max_seconds is not None and seconds > max_seconds:
+            reason = 'time'
+        else:
+            reason = ''
+        estimates.append({'method': method, 'memory': memory_bytes, 'seconds': seconds, 'note': note,
+                          'rejected': reason})
+    feasible = [e for e in estimates if not e['rejected']]
+    choice = min(feasible, key=lambda e: (e['seconds'], e['memory'])) if feasible else None
+    # A Clifford circuit goes to the stabilizer tableau whenever it is allowed: exact and polynomial at any width
+    clifford = [e for e in feasible if e['method'] == 'stabilizer']
+    if clifford:
+        choice = clifford[0]
+
+    if verbose:
+        print(f"Plan for {info['num_qubits']} qubits, depth {info['depth']}, {info['num_gates']} gates "
+              f"({info['two_qubit_gates']} two-qubit), budget {format_bytes(budget)}:")
+        for e in estimates:
+            status = 'chosen' if e is choice else f"rejected ({e['rejected']})" if e['rejected'] else 'feasible'
+            note = f"; {e['note']}" if e['note'] and e['note'] != e['rejected'] else ''
+            print(f"  {e['method']:<22} {format_bytes(e['memory']):>10} {format_seconds(e['seconds']):>10}  {status}{note}")
+        print(f"  planned in {(time.perf_counter() - start) * 1e3:.1f} ms")
+    if choice is None:
+        raise MemoryError(f"no simulation method among {candidates} fits {info['num_qubits']} qubits in "
+                          f"{format_bytes(budget)}" + (f" and {max_seconds} s" if max_seconds else ''))
+    return {'method': choice['method'], 'estimates': estimates, 'info': info}
+
+def preflight(qc, method, memory=None, bytes_per_amplitude=16):
+    # Fail fast when an explicitly requested method cannot fit
+    return plan(qc, memory, methods=[method], bytes_per_amplitude=bytes_per_amplitude, verbose=False)
+
+def make_simulator(chosen, device='CPU'):
+    from qiskit_aer import AerSimulator
+
+    if chosen['method'] == 'partitioned':
+        raise ValueError("partitioned plans run sub-circuits separately, not on one AerSimulator")
+    # Aer runs only the statevector and density matrix methods on a GPU
+    if chosen['method'] not in ('statevector', 'density_matrix'):
+        device = 'CPU'
+    return AerSimulator(method=chosen['method'], device=device)
+
+def format_bytes(size):
+    try:
+        size = float(size)
+    except OverflowError:
+        return 'inf'
+    if math.isinf(size):
+        return 'inf'
+    for unit in ('B', 'KiB', 'MiB', 'GiB', 'TiB', 'PiB'):
+        if size < 1024:
+            return f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1e} EiB"
+
+def format_seconds(seconds):
+    if math.isinf(seconds):
+        return 'inf'
+    return f"{seconds:.2e} s" if seconds >= 1e5 or seconds < 1e-2 else f"{seconds:.2f} s"
+
+if __name__ == "__main__":
+    from brickwork import generate_data
+
+    parser = argparse.ArgumentParser(description="Estimate memory and time per simulation method and pick one.")
+    parser.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--memory', type=float, default=None, help="Memory budget in GiB (default: available).")
+    parser.add_argument('--max-seconds', type=float, default=None, help="Reject methods estimated to take longer.")
+    parser.add_argument('--method', default=None, choices=METHODS, help="Only check this method.")
+    parser.add_argument('--single', action='store_true', help="Single precision amplitudes (8 bytes).")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits, args.layers)
+    try:
+        chosen = plan(qc, args.memory and args.memory * 1024 ** 3, args.max_seconds,
+                      [args.method] if args.method else None, 8 if args.single else 16)
+        print(f"Chosen method: {chosen['method']}")
+    except MemoryError as e:
+        print(f"Error: {e}")
+        raise SystemExit(1)
@@ -1,18 +1,48 @@
+import argparse
 import sys
-import subprocess
+from brickwork import generate_data
+from campaign_manifest import CampaignManifest
+from results_store import circuit_hash
 
-def main():
-    for i in range(1):
-        # Example of generating a CSV filename for each iteration
-        csv_file = f'csv_files6/mil-30q_{i}.csv'
-        result = subprocess.run(['python', 'thirty-bw2-wcsv4.py', '--csv', csv_file])
-        if result.returncode != 0:
-            print(f"Error: Script failed at iteration {i}")
-            return 'error'
+# The cx pairs thirty-bw2-wcsv4.py actually applies: its qc.cx(pairs[0], pairs[1]) broadcasts the first two
+# pairs of a layer into two gates, so the campaign circuit has 2 cx per layer, not the full brickwork
+WCSV4_PAIRS = [[(0, 2), (1, 3)], [(1, 3), (2, 4)]]
+# Aer device of full iterations, the one thirty-bw2-wcsv4.py ran the campaign on
+DEVICE = 'GPU'
+
+def main(iterations=1, sample_only=False, seed=0, device=DEVICE):
+    # Everything runs in this process: qiskit is imported and the circuit built and transpiled once
+    from repetition import run_repetitions, sample_repetitions
+
+    # The circuit the existing mil-30q campaign was run with, so new iterations extend the same results
+    qc = generate_data(two_qubit_gates=WCSV4_PAIRS)
+    metadata = {'master_seed': seed, 'circuit_hash': circuit_hash(qc)}
+    # A preempted campaign resumes where it stopped
+    manifest = CampaignManifest('csv_files6/manifest.csv', qc.num_qubits, metadata['circuit_hash'])
+    try:
+        if sample_only:
+            # Simulate the circuit once and resample the shots for every iteration
+            from one_pass_simulation import final_statevector
+
+            sample_repetitions(final_statevector(qc), iterations, 1000000, seed, 'csv_files6/mil-30q_{i}.csv',
+                               metadata=metadata, manifest=manifest)
+        else:
+            run_repetitions(qc, iterations, 1000000, seed, 'csv_files6/mil-30q_{i}.csv', device=device,
+                            metadata=metadata, manifest=manifest)
+    except Exception as e:
+        print(f"Error: {e}")
+        return 'error'
 
     return 'done'
 
 if __name__ == '__main__':
-    result = main()
-    sys.exit(0 if result == 'done' else 1)
+    parser = argparse.ArgumentParser(description="Repeat the 30-qubit run and write one count file per iteration.")
+    parser.add_argument('--iterations', type=int, default=1, help="Number of iterations.")
+    parser.add_argument('--sample-only', action='store_true', help="Simulate once and only resample the shots.")
+    parser.add_argument('--seed', type=int, default=0, help="Master seed; iteration seeds are spawned from it.")
+    parser.add_argument('--device', default=DEVICE, help="Aer device for full iterations.")
+
+    args = parser.parse_args()
 
+    result = main(args.iterations, args.sample_only, args.seed, args.device)
+    sys.exit(0 if result == 'done' else 1)
@@ -0,0 +1,212 @@
+import argparse
+import heapq
+import os
+import time
+import numpy as np
+from counts import Counts, indices_to_bitstrings
+
+def _spread(indices, qubits):
+    # Local fragment indices -> global outcome indices: local bit j moves to bit qubits[j]
+    outcomes = np.zeros(indices.size, dtype=np.uint64)
+    for j, qubit in enumerate(qubits):
+        outcomes |= ((indices >> np.uint64(j)) & np.uint64(1)) << np.uint64(qubit)
+    return outcomes
+
+def _parity(outcomes, mask):
+    # Parity of the masked bits of every outcome, as 0.0 / 1.0
+    masked = outcomes & np.uint64(mask)
+    parity = np.zeros(outcomes.size, dtype=np.uint64)
+    while masked.any():
+        parity ^= masked & np.uint64(1)
+        masked >>= np.uint64(1)
+    return parity.astype(np.float64)
+
+class ProductDistribution:
+    """Joint distribution of independent fragments, kept as one (outcomes, probabilities, qubits) factor each.
+
+    Fragment f's local bit j is global qubit qubits[f][j]. Joint probabilities, marginals, samples and the
+    most likely joint outcomes are computed from the factors; the cross product is never built.
+    """
+
+    def __init__(self, factors):
+        self.factors = []
+        seen = set()
+        for outcomes, probabilities, qubits in factors:
+            qubits = [int(q) for q in qubits]
+            if seen & set(qubits):
+                raise ValueError(f"fragments overlap on qubits {sorted(seen & set(qubits))}")
+            seen |= set(qubits)
+            outcomes = np.asarray(outcomes, dtype=np.uint64)
+            probabilities = np.asarray(probabilities, dtype=np.float64)
+            order = np.argsort(outcomes)
+            self.factors.append((outcomes[order], probabilities[order] / probabilities.sum(), qubits))
+        self.num_qubits = max(seen) + 1 if seen else 0
+        if len(seen) != self.num_qubits:
+            raise ValueError(f"fragments leave qubits {sorted(set(range(self.num_qubits)) - seen)} uncovered")
+
+    @classmethod
+    def from_counts(cls, counts, qubits=None):
+        # Empirical factors from per-fragment Counts; by default fragment 0 holds the lowest qubits
+        if qubits is None:
+            offsets = np.cumsum([0] + [c.num_qubits for c in counts])
+            qubits = [list(range(offsets[f], offsets[f + 1])) for f in range(len(counts))]
+        return cls([(c.outcomes, c.counts, q) for c, q in zip(counts, qubits)])
+
+    @classmethod
+    def from_statevectors(cls, statevectors, qubits=None):
+        # Exact factors from per-fragment statevectors (or probability vectors), zero entries dropped
+        from shot_sampler import probabilities
+
+        factors = []
+        offset = 0
+        for f, psi in enumerate(statevectors):
+            probs = probabilities(psi)
+            width = int(probs.size).bit_length() - 1
+            nonzero = np.flatnonzero(probs)
+            factors.append((nonzero, probs[nonzero], qubits[f] if qubits else range(offset, offset + width)))
+            offset += width
+        return cls(factors)
+
+    def _local_indices(self, outcome):
+        # Per-fragment local indices of one global outcome given as a bitstring or an integer
+        if isinstance(outcome, str):
+            bits = outcome.replace(' ', '')[::-1]
+            value = lambda q: int(bits[q])
+        else:
+            value = lambda q: (int(outcome) >> q) & 1
+        return [sum(value(q) << j for j, q in enumerate(qubits)) for _, _, qubits in self.factors]
+
+    def probability(self, outcome):
+        # P(outcome) as the product of one lookup per factor
+        p = 1.0
+        for (outcomes, probabilities, _), local in zip(self.factors, self._local_indices(outcome)):
+            i = np.searchsorted(outcomes, np.uint64(local))
+            if i == outcomes.size or outcomes[i] != local:
+                return 0.0
+            p *= probabilities[i]
+        return float(p)
+
+    def marginal(self, qubits):
+        # Dense distribution of `qubits` (qubits[j] is bit j): per-factor marginals, then their outer product
+        result = np.ones(1)
+        positions = []
+        for outcomes, probabilities, factor_qubits in self.factors:
+            local = [(j, factor_qubits.index(q)) for j, q in enumerate(qubits) if q in factor_qubits]
+            if not local:
+                continue
+            keys = np.zeros(outcomes.size, dtype=np.int64)
+            for k, (_, bit) in enumerate(local):
+                keys |= ((outcomes >> np.uint64(bit)) & np.uint64(1)).astype(np.int64) << k
+            # Earlier factors become the low bits of the running product
+            result = np.outer(np.bincount(keys, weights=probabilities, minlength=1 << len(local)), result).ravel()
+            positions += [j for j, _ in local]
+        missing = set(qubits) - {q for _, _, factor_qubits in self.factors for q in factor_qubits}
+        if missing:
+            raise ValueError(f"qubits {sorted(missing)} are not in any fragment")
+        # Reorder the bits from factor order to the requested order
+        index = np.arange(result.size)
+        target = np.zeros(result.size, dtype=np.int64)
+        for k, j in enumerate(positions):
+            target |= ((index >> k) & 1) << j
+        marginal = np.zeros(result.size)
+        marginal[target] = result
+        return marginal
+
+    def expectation_z(self, qubits):
+        # <Z...Z> on `qubits` factorises into per-fragment parity expectations
+        value = 1.0
+        for outcomes, probabilities, factor_qubits in self.factors:
+            mask = sum(1 << factor_qubits.index(q) for q in qubits if q in factor_qubits)
+            if mask:
+                value *= float(np.sum(probabilities * (1 - 2 * _parity(outcomes, mask))))
+        return value
+
+    def sample_local(self, shots, seed=None):
+        # (shots, fragments) local indices, each column drawn independently from its factor
+        rng = np.random.default_rng(seed)
+        columns = []
+        for outcomes, probabilities, _ in self.factors:
+            cumulative = np.cumsum(probabilities)
+            draws = np.searchsorted(cumulative, rng.random(shots) * cumulative[-1], side='right')
+            columns.append(outcomes[np.minimum(draws, outcomes.size - 1)])
+        return np.stack(columns, axis=1)
+
+    def sample_counts(self, shots, seed=None):
+        # Joint shot counts: a Counts for up to 64 qubits, otherwise a qiskit-style {'bitstring': count}
+        local = self.sample_local(shots, seed)
+        if self.num_qubits <= 64:
+            outcomes = np.zeros(shots, dtype=np.uint64)
+            for f, (_, _, qubits) in enumerate(self.factors):
+                outcomes |= _spread(local[:, f], qubits)
+            unique, counts = np.unique(outcomes, return_counts=True)
+            return Counts(unique, counts, self.num_qubits, presorted=True)
+        rows, counts = np.unique(local, axis=0, return_counts=True)
+        return dict(zip(self.bitstrings(rows), counts.tolist()))
+
+    def bitstrings(self, local):
+        # Joint qiskit bitstrings (qubit 0 rightmost) of rows of per-fragment local indices
+        chars = np.full((local.shape[0], self.num_qubits), ord('0'), dtype=np.uint8)
+        for f, (_, _, qubits) in enumerate(self.factors):
+            bits = indices_to_bitstrings(local[:, f], len(qubits))
+            columns = np.frombuffer(bits.tobytes(), dtype=np.uint8).reshape(-1, len(qubits))
+            # Local bit j is the (len - 1 - j)-th character; global qubit q the (n - 1 - q)-th
+            chars[:, [self.num_qubits - 1 - q for q in qubits]] = columns[:, ::-1]
+        return [s.decode() for s in chars.view(f'S{self.num_qubits}').ravel()]
+
+    def top_k(self, k):
+        # The k most likely joint outcomes as ((k, fragments) local indices, probabilities), most likely first.
+        # Best-first search over per-factor ranks: a successor raises one factor's rank by one
+        ranked = []
+        for outcomes, probabilities, _ in self.factors:
+            order = np.argsort(-probabilities, kind='stable')
+            ranked.append((outcomes[order], probabilities[order]))
+        start = (0,) * len(ranked)
+        heap = [(-np.prod([p[0] for _, p in ranked]), start)]
+        seen = {start}
+        rows, values = [], []
+        while heap and len(rows) < k:
+            negative, ranks = heapq.heappop(heap)
+            rows.append([outcomes[r] for (outcomes, _), r in zip(ranked, ranks)])
+            values.append(-negative)
+            for f in range(len(ranked)):
+                if ranks[f] + 1 < ranked[f][1].size:
+                    successor = ranks[:f] + (ranks[f] + 1,) + ranks[f + 1:]
+                    if successor not in seen:
+                        seen.add(successor)
+                        p = np.prod([ranked[g][1][r] for g, r in enumerate(successor)])
+                        heapq.heappush(heap, (-p, successor))
+        return np.array(rows, dtype=np.uint64).reshape(-1, len(ranked)), np.array(values)
+
+    def to_csv(self, csv_file, k, shots=None):
+        # Top-k joint outcomes as Result,Probability rows, or Result,Count expected counts when shots is given
+        local, probabilities = self.top_k(k)
+        os.makedirs(os.path.dirname(csv_file) or '.', exist_ok=True)
+        with open(csv_file, 'w') as f:
+            if shots is None:
+                f.write('Result,Probability\n')
+                for bits, p in zip(self.bitstrings(local), probabilities):
+                    f.write(f"{bits},{p!r}\n")
+            else:
+                f.write('Result,Count\n')
+                for bits, p in zip(self.bitstrings(local), probabilities):
+                    f.write(f"{bits},{int(round(p * shots))}\n")
+
+if __name__ == "__main__":
+    from results_store import read_counts
+
+    parser = argparse.ArgumentParser(description="Combine independent fragment counts as a factored product.")
+    parser.add_argument('files', nargs='+', help="Per-fragment count files, lowest qubits first.")
+    parser.add_argument('--top', type=int, default=20, help="Joint outcomes to export.")
+    parser.add_argument('--csv', default=None, help="Write the top joint outcomes to this CSV file.")
+    parser.add_argument('--shots', type=int, default=None, help="Write expected counts for this many shots.")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    distribution = ProductDistribution.from_counts([read_counts(f) for f in args.files])
+    print(f"{distribution.num_qubits} qubits from {len(args.files)} fragments in {time.perf_counter() - start:.2f} s")
+    local, probabilities = distribution.top_k(args.top)
+    for bits, p in zip(distribution.bitstrings(local[:5]), probabilities[:5]):
+        print(f"  {bits} {p:.3e}")
+    if args.csv:
+        distribution.to_csv(args.csv, args.top, args.shots)
@@ -0,0 +1,222 @@
+import argparse
+import os
+import time
+import numpy as np
+from brickwork import generate_data
+from campaign_manifest import CampaignManifest
+from one_pass_simulation import final_statevector
+from counts import Counts
+from results_store import circuit_hash, write_counts
+from shot_sampler import AliasSampler
+
+def iteration_seed(master_seed, iteration):
+    # Independent 63-bit seed for one iteration; depends only on the master seed and the index
+    words = np.random.SeedSequence(master_seed, spawn_key=(iteration,)).generate_state(2, np.uint32)
+    return (int(words[0]) << 32 | int(words[1])) & (2 ** 63 - 1)
+
+def resample_counts(sampler, num_qubits, shots, seed):
+    outcomes, counts = sampler.histogram(shots, seed)
+    return Counts(outcomes, counts, num_qubits, presorted=True)
+
+def simulate_counts(simulator, compiled_circuit, num_qubits, shots, seed):
+    result = simulator.run(compiled_circuit, shots=shots, seed_simulator=seed).result()
+    return Counts.from_dict(result.get_counts(compiled_circuit), num_qubits)
+
+def write_iteration(counts, out_pattern, iteration, seed, metadata=None):
+    # Files carry only the iteration's own seed and index, so their bytes do not depend on who wrote them
+    out_file = out_pattern.format(i=iteration)
+    write_counts(counts, out_file, seed=seed, iteration=iteration, **(metadata or {}))
+    return out_file
+
+def pending_iterations(iterations, shots, master_seed, out_pattern, start=0, manifest=None):
+    # Without a manifest everything runs; with one, iterations it records as complete and intact are skipped
+    todo = list(range(start, start + iterations))
+    if manifest is None:
+        return todo
+    pending = manifest.pending(todo, lambda i: iteration_seed(master_seed, i), shots, out_pattern)
+    if len(pending) < len(todo):
+        print(f"Skipping {len(todo) - len(pending)} completed iterations, {len(pending)} left")
+    return pending
+
+def prepare_sampler(qc, path, statevector_path=None, engine='native'):
+    # Alias tables of qc's output distribution at `path`, built by the first caller and only opened after that:
+    # from a dumped statevector when there is one, otherwise from a fresh simulation
+    if not os.path.exists(f"{path}.blocks.npz"):
+        if statevector_path and os.path.exists(statevector_path):
+            from statevector_store import load_statevector
+
+            psi = load_statevector(statevector_path)
+        else:
+            psi = final_statevector(qc, engine)
+        # The blocks file is written last, so its presence means the tables are complete
+        AliasSampler(psi, path=path)
+        del psi
+    return AliasSampler.open(path)
+
+def sample_repetitions(psi, iterations, shots, master_seed, out_pattern, start=0, metadata=None, manifest=None):
+    # Resample an already simulated state (or a prepared AliasSampler); every iteration is only a shot draw
+    # and a file write
+    sampler = psi if isinstance(psi, AliasSampler) else AliasSampler(psi)
+    num_qubits = int(sampler.size).bit_length() - 1
+    for i in pending_iterations(iterations, shots, master_seed, out_pattern, start, manifest):
+        seed = iteration_seed(master_seed, i)
+        out_file = write_iteration(resample_counts(sampler, num_qubits, shots, seed), out_pattern, i, seed, metadata)
+        if manifest is not None:
+            manifest.record(i, seed, shots, out_file)
+    return [out_pattern.format(i=i) for i in range(start, start + iterations)]
+
+def prepare_simulator(qc, device='CPU', threads=0, method='statevector'):
+    # Build the simulator and transpile once; every iteration reuses both (threads=0 lets Aer use every core)
+    from qiskit import transpile
+    from planner import METHODS, make_simulator, plan, preflight
+
+    if method == 'auto':
+        chosen = plan(qc, methods=[m for m in METHODS if m != 'partitioned'])
+    else:
+        chosen = preflight(qc, method)
+    simulator = make_simulator(chosen, device)
+    simulator.set_options(max_parallel_threads=threads)
+    return simulator, transpile(qc, simulator)
+
+def run_repetitions(qc, iterations, shots, master_seed, out_pattern, start=0, device='CPU', metadata=None,
+                    manifest=None, method='statevector'):
+    # Full re-simulation per iteration, in-process: no interpreter start, import or transpile per iteration
+    todo = pending_iterations(iterations, shots, master_seed, out_pattern, start, manifest)
+    if todo:
+        simulator, compiled_circuit = prepare_simulator(qc, device, method=method)
+    for i in todo:
+        iteration_start = time.perf_counter()
+        seed = iteration_seed(master_seed, i)
+        counts = simulate_counts(simulator, compiled_circuit, qc.num_qubits, shots, seed)
+        out_file = write_iteration(counts, out_pattern, i, seed, metadata)
+        if manifest is not None:
+            manifest.record(i, seed, shots, out_file)
+        print(f"Iteration {i}: {time.perf_counter() - iteration_start:.2f} s")
+    return [out_pattern.format(i=i) for i in range(start, start + iterations)]
+
+# Per-process state of a pool worker: a warm simulator or sampler, built once by _init_worker
+_worker = {}
+
+def _init_worker(qc, device, threads, sampler_path, method='statevector'):
+    if sampler_path:
+        # Tables built once by the parent; every worker maps the same pages read-only
+        sampler = AliasSampler.open(sampler_path)
+        _worker['num_qubits'] = int(sampler.size).bit_length() - 1
+        _worker['sampler'] = sampler
+    else:
+        _worker['num_qubits'] = qc.num_qubits
+        _worker['simulator'], _worker['compiled_circuit'] = prepare_simulator(qc, device, threads, method)
+
+def _run_iteration(iteration, shots, master_seed, out_pattern, metadata):
+    iteration_start = time.perf_counter()
+    seed = iteration_seed(master_seed, iteration)
+    if 'sampler' in _worker:
+        counts = resample_counts(_worker['sampler'], _worker['num_qubits'], shots, seed)
+    else:
+        counts = simulate_counts(_worker['simulator'], _worker['compiled_circuit'], _worker['num_qubits'], shots, seed)
+    out_file = write_iteration(counts, out_pattern, iteration, seed, metadata)
+    return iteration, out_file, time.perf_counter() - iteration_start, os.getpid()
+
+def run_parallel(qc, iterations, shots, master_seed, out_pattern, start=0, workers=None, device='CPU',
+                 statevector_path=None, metadata=None, manifest=None, method='statevector', sampler_path=None):
+    # Spread iterations over worker processes; with statevector_path the workers resample a dumped state,
+    # with sampler_path they open alias tables prepared earlier
+    from concurrent.futures import ProcessPoolExecutor, as_completed
+
+    todo = pending_iterations(iterations, shots, master_seed, out_pattern, start, manifest)
+    workers = min(workers or os.cpu_count(), max(len(todo), 1))
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    if statevector_path and todo and not sampler_path:
+        from statevector_store import load_statevector
+
+        # Alias tables (10 bytes per outcome) are written next to the dump once, not rebuilt per worker
+        sampler_path = os.path.splitext(statevector_path)[0] + '_alias'
+        AliasSampler(load_statevector(statevector_path), path=sampler_path)
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(qc, device, threads, sampler_path, method)) as pool:
+        futures = [pool.submit(_run_iteration, i, shots, master_seed, out_pattern, metadata) for i in todo]
+        for future in as_completed(futures):
+            i, out_file, elapsed, pid = future.result()
+            # Only this process appends to the manifest
+            if manifest is not None:
+                manifest.record(i, iteration_seed(master_seed, i), shots, out_file)
+            print(f"Iteration {i}: {elapsed:.2f} s (worker {pid})")
+    return [out_pattern.format(i=i) for i in range(start, start + iterations)]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write N count files for the brickwork circuit in one process.")
+    parser.add_argument('--iterations', type=int, required=True, help="Number of count files to write.")
+    parser.add_argument('--start', type=int, default=0, help="Index of the first iteration.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Shots per iteration.")
+    parser.add_argument('--seed', type=int, default=0, help="Master seed; iteration seeds are spawned from it.")
+    parser.add_argument('--out', default='csv_files6/mil-30q_{i}.csv',
+                        help="Output path pattern with an {i} field; a .npz suffix selects the binary format.")
+    parser.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    parser.add_argument('--engine', default='native', choices=['native', 'aer'], help="Statevector engine.")
+    parser.add_argument('--full', action='store_true',
+                        help="Re-run the Aer simulation for every iteration instead of resampling one state.")
+    parser.add_argument('--device', default='CPU', help="Aer device for --full runs.")
+    parser.add_argument('--method', default='statevector',
+                        choices=['auto', 'statevector', 'density_matrix', 'matrix_product_state', 'stabilizer'],
+                        help="Aer method for --full runs; 'auto' lets the planner pick the cheapest that fits.")
+    parser.add_argument('--workers', type=int, default=1, help="Worker processes; output does not depend on it.")
+    parser.add_argument('--statevector', default=None,
+                        help="Path of the .npy dump the resampling workers share (default: next to the outputs).")
+    parser.add_argument('--sampler', default=None,
+                        help="Path prefix of shared alias tables: opened if present, otherwise built (from --statevector "
+                             "when that dump exists) and kept for later runs.")
+    parser.add_argument('--manifest', default=None,
+                        help="Campaign manifest CSV used to skip finished iterations (default: next to the outputs).")
+    parser.add_argument('--no-manifest', action='store_true', help="Run every iteration and keep no manifest.")
+
+    args = parser.parse_args()
+
+    qc = generate_data(args.qubits)
+    metadata = {'master_seed': args.seed, 'circuit_hash': circuit_hash(qc)}
+    manifest = None
+    if not args.no_manifest:
+        manifest = CampaignManifest(args.manifest or os.path.join(os.path.dirname(args.out) or '.', 'manifest.csv'),
+                                    args.qubits, metadata['circuit_hash'])
+        if not pending_iterations(args.iterations, args.shots, args.seed, args.out, args.start, manifest):
+            raise SystemExit(0)
+
+    if args.full and args.workers > 1:
+        start = time.perf_counter()
+        run_parallel(qc, args.iterations, args.shots, args.seed, args.out, args.start, args.workers, args.device,
+                     metadata=metadata, manifest=manifest, method=args.method)
+        print(f"Ran {args.iterations} iterations on {args.workers} workers in {time.perf_counter() - start:.2f} s")
+    elif args.full:
+        start = time.perf_counter()
+        run_repetitions(qc, args.iterations, args.shots, args.seed, args.out, args.start, args.device, metadata,
+                        manifest, args.method)
+        print(f"Ran {args.iterations} iterations in {time.perf_counter() - start:.2f} s")
+    elif args.sampler:
+        start = time.perf_counter()
+        sampler = prepare_sampler(qc, args.sampler, args.statevector, args.engine)
+        print(f"Alias tables ready at {args.sampler} in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        if args.workers > 1:
+            run_parallel(qc, args.iterations, args.shots, args.seed, args.out, args.start, args.workers,
+                         metadata=metadata, manifest=manifest, sampler_path=args.sampler)
+        else:
+            sample_repetitions(sampler, args.iterations, args.shots, args.seed, args.out, args.start, metadata,
+                               manifest)
+        print(f"Wrote {args.iterations} count files in {time.perf_counter() - start:.2f} s")
+    else:
+        start = time.perf_counter()
+        psi = final_statevector(qc, args.engine)
+        print(f"Simulated {args.qubits} qubits once in {time.perf_counter() - start:.2f} s")
+
+        start = time.perf_counter()
+        if args.workers > 1:
+            from statevector_store import dump_statevector
+
+            statevector_path = args.statevector or os.path.join(os.path.dirname(args.out) or '.', 'statevector.npy')
+            dump_statevector(psi, statevector_path)
+            del psi
+            run_parallel(qc, args.iterations, args.shots, args.seed, args.out, args.start, args.workers,
+                         statevector_path=statevector_path, metadata=metadata, manifest=manifest)
+        else:
+            sample_repetitions(psi, args.iterations, args.shots, args.seed, args.out, args.start, metadata, manifest)
+        print(f"Wrote {args.iterations} count files in {time.perf_counter() - start:.2f} s")
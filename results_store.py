@@ -0,0 +1,122 @@
+import argparse
+import csv
+import hashlib
+import json
+import os
+import time
+import numpy as np
+from counts import Counts
+
+FORMAT_VERSION = 1
+
+def circuit_hash(qc):
+    # Stable fingerprint of a circuit, stored next to its results
+    try:
+        from qiskit import qasm2
+        text = qasm2.dumps(qc)
+    except Exception:
+        text = repr([(inst.operation.name, [float(p) for p in inst.operation.params],
+                      [qc.find_bit(q).index for q in inst.qubits]) for inst in qc.data])
+    return hashlib.sha256(text.encode()).hexdigest()
+
+def _smallest_uint(values):
+    top = int(values.max()) if values.size else 0
+    for dtype in (np.uint8, np.uint16, np.uint32, np.uint64):
+        if top <= np.iinfo(dtype).max:
+            return values.astype(dtype)
+
+def write_counts_npz(counts, path, **metadata):
+    # Sorted outcomes are stored as deltas and both columns in the narrowest integer type
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    header = {'format_version': FORMAT_VERSION, 'num_qubits': counts.num_qubits, 'shots': counts.shots}
+    header.update(metadata)
+    deltas = np.diff(counts.outcomes, prepend=np.uint64(0))
+    np.savez_compressed(path, outcome_deltas=_smallest_uint(deltas), counts=_smallest_uint(counts.counts),
+                        metadata=np.array(json.dumps(header)))
+
+def read_counts_npz(path):
+    with np.load(path) as data:
+        outcomes = np.cumsum(data['outcome_deltas'].astype(np.uint64), dtype=np.uint64)
+        metadata = json.loads(str(data['metadata']))
+        return Counts(outcomes, data['counts'].astype(np.int64), metadata['num_qubits'], presorted=True), metadata
+
+def write_probabilities_npz(probs, path, num_qubits, outcomes=None, **metadata):
+    # Exact output instead of counts: the full 2^n vector, or the probabilities of a sorted outcome set.
+    # Stored uncompressed, since float probabilities do not compress and 2^30 of them would take minutes
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    header = {'format_version': FORMAT_VERSION, 'kind': 'probabilities', 'num_qubits': num_qubits,
+              'complete': outcomes is None}
+    header.update(metadata)
+    arrays = {'probabilities': np.asarray(probs), 'metadata': np.array(json.dumps(header))}
+    if outcomes is not None:
+        outcomes = np.asarray(outcomes, dtype=np.uint64)
+        order = np.argsort(outcomes)
+        arrays['probabilities'] = arrays['probabilities'][order]
+        arrays['outcome_deltas'] = _smallest_uint(np.diff(outcomes[order], prepend=np.uint64(0)))
+    np.savez(path, **arrays)
+
+def read_probabilities_npz(path):
+    # (outcomes, probabilities, metadata); outcomes is None for a complete vector, whose index is the outcome
+    with np.load(path) as data:
+        metadata = json.loads(str(data['metadata']))
+        outcomes = None
+        if 'outcome_deltas' in data:
+            outcomes = np.cumsum(data['outcome_deltas'].astype(np.uint64), dtype=np.uint64)
+        return outcomes, data['probabilities'], metadata
+
+def counts_from_probabilities(path, shots, seed=None):
+    # Shot counts as a derived product of a stored complete vector
+    from shot_sampler import sample_histogram
+
+    outcomes, probs, metadata = read_probabilities_npz(path)
+    if outcomes is not None:
+        raise ValueError(f"{path} holds {probs.size} selected outcomes, not a distribution to sample from")
+    outcomes, counts = sample_histogram(probs, shots, seed)
+    return Counts(outcomes, counts, metadata['num_qubits'], presorted=True)
+
+def read_metadata(path):
+    with np.load(path) as data:
+        return json.loads(str(data['metadata']))
+
+def write_counts(counts, path, **metadata):
+    # The output path picks the format: *.npz is binary, anything else the Result,Count CSV
+    if path.endswith('.npz'):
+        write_counts_npz(counts, path, **metadata)
+    else:
+        counts.to_csv(path)
+
+def read_counts(path):
+    if path.endswith('.npz'):
+        return read_counts_npz(path)[0]
+    return Counts.from_csv(path)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Convert Result,Count CSV files to the binary .npz format.")
+    parser.add_argument('csv_files', nargs='+', help="Input Result,Count CSV files.")
+    parser.add_argument('--out', required=True, help="Output directory for the .npz files.")
+
+    args = parser.parse_args()
+
+    csv_bytes = npz_bytes = 0
+    for csv_file in args.csv_files:
+        npz_file = os.path.join(args.out, os.path.splitext(os.path.basename(csv_file))[0] + '.npz')
+        counts = Counts.from_csv(csv_file)
+        write_counts_npz(counts, npz_file, source=os.path.basename(csv_file))
+        csv_bytes += os.path.getsize(csv_file)
+        npz_bytes += os.path.getsize(npz_file)
+
+    # Baseline: the csv.reader loop every analysis script uses to rebuild its counts dict
+    start = time.perf_counter()
+    for csv_file in args.csv_files:
+        with open(csv_file, newline='') as cf:
+            csv_reader = csv.reader(cf)
+            next(csv_reader)
+            data = {row[0]: int(row[1]) for row in csv_reader}
+    csv_time = time.perf_counter() - start
+    start = time.perf_counter()
+    for csv_file in args.csv_files:
+        read_counts(os.path.join(args.out, os.path.splitext(os.path.basename(csv_file))[0] + '.npz'))
+    npz_time = time.perf_counter() - start
+
+    print(f"Disk: {csv_bytes / 1e6:.1f} MB CSV -> {npz_bytes / 1e6:.1f} MB npz ({csv_bytes / max(npz_bytes, 1):.1f}x)")
+    print(f"Load: {csv_time:.2f} s CSV -> {npz_time:.2f} s npz ({csv_time / max(npz_time, 1e-9):.1f}x)")
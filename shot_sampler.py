@@ -0,0 +1,203 @@
+import argparse
+import time
+import numpy as np
+
+# Outcomes per block: block-local cumulative sums and alias indices stay small (2^16 fits uint16)
+BLOCK_SIZE = 1 << 16
+# Uniform draws generated at once; bounds the temporaries regardless of the total shot count
+SHOT_CHUNK = 1 << 22
+
+def probabilities(psi):
+    # |psi|^2 as float64; accepts a statevector or an already real probability vector
+    psi = np.asarray(psi)
+    if np.iscomplexobj(psi):
+        return psi.real ** 2 + psi.imag ** 2
+    return psi.astype(np.float64, copy=False)
+
+def _block_masses(probs, block_size):
+    return np.add.reduceat(probs, np.arange(0, probs.size, block_size))
+
+def _sorted_histogram(parts):
+    # Merge (outcomes, counts) pieces into one sorted histogram with unique outcomes
+    parts = [part for part in parts if part[0].size]
+    if not parts:
+        return np.empty(0, dtype=np.uint64), np.empty(0, dtype=np.int64)
+    outcomes = np.concatenate([part[0] for part in parts])
+    counts = np.concatenate([part[1] for part in parts])
+    unique, inverse = np.unique(outcomes, return_inverse=True)
+    return unique, np.bincount(inverse, weights=counts, minlength=unique.size).astype(np.int64)
+
+def _iter_block_draws(probs, shots, rng, block_size):
+    # Split the shots over blocks with one multinomial draw, then invert each block's CDF
+    masses = _block_masses(probs, block_size)
+    per_block = rng.multinomial(shots, masses / masses.sum())
+    for block in np.flatnonzero(per_block):
+        start = np.uint64(block * block_size)
+        cumulative = np.cumsum(probs[int(start):int(start) + block_size])
+        remaining = int(per_block[block])
+        while remaining:
+            draws = min(remaining, SHOT_CHUNK)
+            local = np.searchsorted(cumulative, rng.random(draws) * cumulative[-1], side='right')
+            local = np.minimum(local, cumulative.size - 1)
+            yield start, local
+            remaining -= draws
+
+def sample_indices(probs, shots, seed=None, block_size=BLOCK_SIZE):
+    # One-off draw of outcome indices, grouped by block rather than in draw order
+    rng = np.random.default_rng(seed)
+    pieces = [start + local.astype(np.uint64) for start, local in _iter_block_draws(probs, shots, rng, block_size)]
+    if not pieces:
+        return np.empty(0, dtype=np.uint64)
+    return np.concatenate(pieces)
+
+def sample_histogram(probs, shots, seed=None, block_size=BLOCK_SIZE):
+    # One-off histogram: sorted (outcomes, counts) built with a per-block bincount
+    rng = np.random.default_rng(seed)
+    parts = []
+    current, histogram = None, None
+    for start, local in _iter_block_draws(probs, shots, rng, block_size):
+        if start != current:
+            if current is not None:
+                nonzero = np.flatnonzero(histogram)
+                parts.append((current + nonzero.astype(np.uint64), histogram[nonzero]))
+            current, histogram = start, np.zeros(min(block_size, probs.size - int(start)), dtype=np.int64)
+        histogram += np.bincount(local, minlength=histogram.size)
+    if current is not None:
+        nonzero = np.flatnonzero(histogram)
+        parts.append((current + nonzero.astype(np.uint64), histogram[nonzero]))
+    return _sorted_histogram(parts)
+
+def build_alias_table(weights):
+    # Vectorised Vose alias table for a weight vector; returns (threshold, alias)
+    size = weights.size
+    total = weights.sum()
+    threshold = weights * (size / total) if total > 0 else np.ones(size)
+    alias_dtype = np.uint16 if size <= 1 << 16 else np.uint32 if size <= 1 << 32 else np.uint64
+    alias = np.arange(size, dtype=alias_dtype)
+
+    small = np.flatnonzero(threshold < 1.0)
+    large = np.flatnonzero(threshold >= 1.0)
+    while small.size and large.size:
+        # Hand each small entry to the first large entry whose running surplus covers it
+        deficit = 1.0 - threshold[small]
+        owner = np.searchsorted(np.cumsum(threshold[large] - 1.0), np.cumsum(deficit), side='left')
+        owner = np.minimum(owner, large.size - 1)
+        alias[small] = large[owner]
+        threshold[large] -= np.bincount(owner, weights=deficit, minlength=large.size)
+
+        # Large entries pushed below one become the next round's small entries
+        keep = threshold[large] >= 1.0
+        small = large[~keep]
+        large = large[keep]
+
+    # Whatever is left over is 1 up to rounding
+    threshold[large] = 1.0
+    threshold[small] = 1.0
+    return threshold, alias
+
+class AliasSampler:
+    """Reusable O(1)-per-shot sampler over a 2^n probability vector.
+
+    Alias tables are built per block of BLOCK_SIZE outcomes plus one table over the
+    block masses, so construction temporaries stay bounded and each outcome costs
+    10 bytes (float64 threshold + uint16 local alias). With a path the tables are
+    written to .npy files that other processes open read-only with AliasSampler.open().
+    """
+
+    def __init__(self, probs, block_size=BLOCK_SIZE, path=None):
+        # probs may be a statevector or a memory map of one; only one block is squared at a time
+        self.size = probs.size
+        self.block_size = min(block_size, probs.size)
+        alias_dtype = np.uint16 if self.block_size <= 1 << 16 else np.uint32
+        if path:
+            from statevector_store import open_statevector_sink
+
+            num_qubits = int(probs.size).bit_length() - 1
+            self.threshold = open_statevector_sink(f"{path}.threshold.npy", num_qubits, np.float64)
+            self.alias = open_statevector_sink(f"{path}.alias.npy", num_qubits, alias_dtype)
+        else:
+            self.threshold = np.empty(probs.size, dtype=np.float64)
+            self.alias = np.empty(probs.size, dtype=alias_dtype)
+
+        starts = range(0, probs.size, self.block_size)
+        masses = np.array([np.add.reduceat(probabilities(probs[start:start + self.block_size]), [0])[0]
+                           for start in starts])
+        self.block_threshold, self.block_alias = build_alias_table(masses)
+        for start in starts:
+            threshold, alias = build_alias_table(probabilities(probs[start:start + self.block_size]))
+            self.threshold[start:start + threshold.size] = threshold
+            self.alias[start:start + alias.size] = alias
+        if path:
+            self.threshold.flush()
+            self.alias.flush()
+            np.savez(f"{path}.blocks.npz", block_threshold=self.block_threshold, block_alias=self.block_alias,
+                     block_size=self.block_size)
+
+    @classmethod
+    def open(cls, path):
+        # Tables written by AliasSampler(probs, path=path), memory-mapped read-only: workers share the pages
+        sampler = cls.__new__(cls)
+        sampler.threshold = np.load(f"{path}.threshold.npy", mmap_mode='r')
+        sampler.alias = np.load(f"{path}.alias.npy", mmap_mode='r')
+        sampler.size = sampler.threshold.size
+        with np.load(f"{path}.blocks.npz") as blocks:
+            sampler.block_threshold = blocks['block_threshold']
+            sampler.block_alias = blocks['block_alias']
+            sampler.block_size = int(blocks['block_size'])
+        return sampler
+
+    def _draw(self, count, rng):
+        blocks = rng.integers(0, self.block_threshold.size, size=count)
+        blocks = np.where(rng.random(count) < self.block_threshold[blocks], blocks, self.block_alias[blocks])
+        starts = blocks.astype(np.uint64) * np.uint64(self.block_size)
+        local = rng.integers(0, self.block_size, size=count).astype(np.uint64)
+        flat = starts + local
+        keep = rng.random(count) < self.threshold[flat]
+        return np.where(keep, flat, starts + self.alias[flat].astype(np.uint64))
+
+    def iter_samples(self, shots, seed=None):
+        # Outcome indices in chunks of at most SHOT_CHUNK
+        rng = np.random.default_rng(seed)
+        remaining = shots
+        while remaining:
+            count = min(remaining, SHOT_CHUNK)
+            yield self._draw(count, rng)
+            remaining -= count
+
+    def sample(self, shots, seed=None):
+        chunks = list(self.iter_samples(shots, seed))
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.uint64)
+
+    def histogram(self, shots, seed=None):
+        # Sorted (outcomes, counts); memory grows with distinct outcomes, not with shots
+        parts = []
+        for chunk in self.iter_samples(shots, seed):
+            parts.append(np.unique(chunk, return_counts=True))
+            if len(parts) > 8:
+                parts = [_sorted_histogram(parts)]
+        return _sorted_histogram(parts)
+
+def histogram_to_counts(outcomes, counts, num_qubits):
+    # Back to the qiskit-style {'bitstring': count} dict
+    return {format(int(outcome), f'0{num_qubits}b'): int(count) for outcome, count in zip(outcomes, counts)}
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the shot samplers on a random 2^n distribution.")
+    parser.add_argument('--qubits', type=int, default=24, help="Number of qubits.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Number of shots.")
+
+    args = parser.parse_args()
+
+    probs = np.random.default_rng(0).exponential(size=2 ** args.qubits)
+    probs /= probs.sum()
+
+    start = time.perf_counter()
+    outcomes, counts = sample_histogram(probs, args.shots, seed=1)
+    print(f"Cumulative-sum histogram: {outcomes.size} outcomes in {time.perf_counter() - start:.2f} s")
+
+    start = time.perf_counter()
+    sampler = AliasSampler(probs)
+    print(f"Alias table built in {time.perf_counter() - start:.2f} s")
+    start = time.perf_counter()
+    outcomes, counts = sampler.histogram(args.shots, seed=1)
+    print(f"Alias histogram: {outcomes.size} outcomes in {time.perf_counter() - start:.2f} s")
@@ -4,7 +4,6 @@ import os
 from qiskit import QuantumCircuit
 from qiskit.visualization import plot_histogram
 from qiskit.compiler import transpile
-from qiskit_aer import AerSimulator
 def generate_data():
     # Initialize the 30-qubit Quantum Circuit
     qc = QuantumCircuit(60)
@@ -62,11 +61,17 @@ def generate_data():
 
     return qc
 
-def run_qiskit_simulation(qc):
-    # Simulate the circuit using qiskit-aer-gpu
-    simulator = AerSimulator(method='statevector', device='GPU')
+def choose_simulator(qc, device='GPU'):
+    # Pick a method that fits before anything is allocated; 60 qubits rule out the statevector, and a
+    # partitioned plan cannot run on a single AerSimulator
+    from planner import METHODS, make_simulator, plan
+
+    return make_simulator(plan(qc, methods=[m for m in METHODS if m != 'partitioned']), device)
+
+def run_qiskit_simulation(qc, shots=1000000, device='GPU'):
+    simulator = choose_simulator(qc, device)
     compiled_circuit = transpile(qc, simulator)
-    result = simulator.run(compiled_circuit, shots=1000000).result()
+    result = simulator.run(compiled_circuit, shots=shots).result()
     counts = result.get_counts(compiled_circuit)
     return counts
 
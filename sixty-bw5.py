@@ -1,6 +1,4 @@
 import argparse
-import csv
-import os
 from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 
@@ -73,26 +71,35 @@ def run_qiskit_simulation(qc):
         return None
 
 def write_data_to_csv(data, csv_file):
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    # The path picks the format: *.npz is the binary counts store, anything else the Result,Count CSV
+    from counts import Counts
+    from results_store import write_counts
 
-    with open(csv_file, 'w', newline='') as cf:
-        csv_writer = csv.writer(cf)
-        csv_writer.writerow(['Result', 'Count'])
-
-        for key, value in data.items():
-            csv_writer.writerow([key, value])
+    write_counts(Counts.from_dict(data), csv_file)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate data and save to CSV.")
-    parser.add_argument('--csv', required=True, help="Path to the output CSV file.")
+    parser.add_argument('--csv', default=None, help="Path to the output CSV file, or .npz for the binary format "
+                                                    "(required without --exact).")
+    parser.add_argument('--exact', default=None, help="Write exact probabilities of the --outcomes set to this .npz "
+                                                      "file instead of sampling.")
+    parser.add_argument('--outcomes', default=None, help="Outcome set for --exact: a counts file or one bitstring per line.")
 
     args = parser.parse_args()
+    if not args.csv and not args.exact:
+        parser.error("one of --csv or --exact is required")
 
     qc = generate_data()
-    counts = run_qiskit_simulation(qc)
-    if counts:
-        write_data_to_csv(counts, args.csv)
+    if args.exact:
+        from exact_probabilities import read_outcomes, write_exact
+
+        if not args.outcomes:
+            parser.error("--exact needs --outcomes: 60 qubits have no storable probability vector")
+        write_exact(qc, args.exact, read_outcomes(args.outcomes))
     else:
-        print("Simulation failed.")
+        counts = run_qiskit_simulation(qc)
+        if counts:
+            write_data_to_csv(counts, args.csv)
+        else:
+            print("Simulation failed.")
 
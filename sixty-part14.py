@@ -1,5 +1,5 @@
 import pandas as pd
-from qiskit import QuantumCircuit, transpile, assemble
+from qiskit import QuantumCircuit, transpile
 from qiskit_aer import AerSimulator
 
 
@@ -89,30 +89,28 @@ def run_qiskit_simulation(qc):
         print(f"Error during simulation: {e}")
         return None
 
-def simulate_and_save(qc, filename):
-    simulator = AerSimulator()
-    compiled_circuit = transpile(qc, simulator)
-    qobj = assemble(compiled_circuit)
-    result = simulator.run(qobj).result()
-    counts = result.get_counts(qc)
+def save_counts(counts, filename):
     counts_df = pd.DataFrame(list(counts.items()), columns=['State', 'Counts'])
     counts_df = counts_df.sort_values(by='Counts', ascending=False)
     counts_df.to_csv(filename, index=False)
 
-# Create the 60-qubit circuit
-full_circuit = create_60_qubit_circuit()
+if __name__ == "__main__":
+    from fragment_executor import run_fragments
 
-# Define qubits for each 30-qubit sub-circuit
-qubits_1 = list(range(30))  # First 30 qubits
-qubits_2 = list(range(30, 60))  # Last 30 qubits
+    # Create the 60-qubit circuit
+    full_circuit = create_60_qubit_circuit()
 
-# Create sub-circuits for 30 qubits
-qc1 = create_sub_circuit(full_circuit, qubits_1)
-qc2 = create_sub_circuit(full_circuit, qubits_2)
+    # Define qubits for each 30-qubit sub-circuit
+    qubits_1 = list(range(30))  # First 30 qubits
+    qubits_2 = list(range(30, 60))  # Last 30 qubits
 
-# Simulate each 30-qubit sub-circuit
-simulate_and_save(qc1, 'simulation_results_3.csv')
-simulate_and_save(qc2, 'simulation_results_4.csv')
+    # Create sub-circuits for 30 qubits
+    qc1 = create_sub_circuit(full_circuit, qubits_1)
+    qc2 = create_sub_circuit(full_circuit, qubits_2)
 
-print("Simulation results saved to 'simulation_results_3.csv' and 'simulation_results_4.csv'.")
+    # The sub-circuits are independent, so simulate them concurrently (1024 shots, the AerSimulator default)
+    counts1, counts2 = (counts.to_dict() for counts in run_fragments([qc1, qc2], shots=1024))
+    save_counts(counts1, 'simulation_results_3.csv')
+    save_counts(counts2, 'simulation_results_4.csv')
 
+    print("Simulation results saved to 'simulation_results_3.csv' and 'simulation_results_4.csv'.")
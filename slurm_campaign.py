@@ -0,0 +1,237 @@
+import argparse
+import json
+import math
+import os
+import subprocess
+import sys
+import time
+from campaign_manifest import CampaignManifest
+from repetition import iteration_seed
+
+# Bytes per outcome of the alias tables the resampling tasks share (float64 threshold + uint16 alias)
+ALIAS_BYTES_PER_OUTCOME = 10
+
+# Anything a campaign spec leaves out; the #SBATCH values mirror run_quantum_simulation.sbatch, except
+# 'mem', which is derived per job by job_memory() unless the spec sets it
+DEFAULT_SPEC = {
+    'name': 'mil-30q',
+    'iterations': 200,
+    'tasks': 8,
+    'shots': 1000000,
+    'seed': 0,
+    'qubits': 30,
+    'out': 'csv_files6/mil-30q_{i}.csv',
+    'aggregate': 'csv_files6/mil-30q_total.npz',
+    'full': False,
+    'workers': 1,
+    'sbatch': {
+        'time': '00:15:00',
+        'nodes': 1,
+        'ntasks-per-node': 8,
+        'gres': 'gpu:v100:2',
+        'partition': 'scavenger',
+    },
+    'modules': ['miniconda3', 'cuda/11.8.89-oequqoy', 'py-matplotlib/3.8.3-py310-fp2sij3'],
+}
+
+def load_spec(path):
+    with open(path) as f:
+        spec = json.load(f)
+    merged = dict(DEFAULT_SPEC, **spec)
+    merged['sbatch'] = dict(DEFAULT_SPEC['sbatch'], **spec.get('sbatch', {}))
+    return merged
+
+def task_slices(iterations, tasks):
+    # Contiguous (start, count) per array task; the first iterations % tasks tasks take one extra
+    base, extra = divmod(iterations, tasks)
+    slices = []
+    start = 0
+    for task in range(tasks):
+        count = base + (task < extra)
+        slices.append((start, count))
+        start += count
+    return slices
+
+def shared_paths(spec):
+    # The statevector dumped once by the prepare job and the alias tables built from it
+    directory = os.path.dirname(spec['out']) or '.'
+    return os.path.join(directory, 'statevector.npy'), os.path.join(directory, 'alias')
+
+def job_memory(spec, job):
+    # --mem of one job from the planner's statevector estimate: the prepare job holds the statevector and
+    # writes the alias tables, resampling tasks (and the reducer) get the tables' size, full re-simulations hold one
+    # statevector per worker. Divided by MEMORY_FRACTION, as the planner's preflight expects
+    from brickwork import generate_data
+    from planner import MEMORY_FRACTION, analyze_circuit, estimate
+
+    statevector = estimate(analyze_circuit(generate_data(spec['qubits'])), 'statevector')[0]
+    tables = ALIAS_BYTES_PER_OUTCOME * 2 ** spec['qubits']
+    if job == 'prepare':
+        needed = statevector + tables
+    elif spec['full']:
+        needed = statevector * spec['workers']
+    else:
+        needed = tables
+    return f"{math.ceil(needed / MEMORY_FRACTION / 1024 ** 3) + 1}G"
+
+def task_manifest(spec, task):
+    # One manifest per array task, so concurrent tasks never append to the same file
+    return os.path.join(os.path.dirname(spec['out']) or '.', f"manifest_{task}.csv")
+
+def _header(spec, job_name, extra=(), job='array'):
+    lines = ['#!/bin/bash', '']
+    sbatch = dict(spec['sbatch'])
+    sbatch.setdefault('mem', job_memory(spec, job))
+    lines += [f"#SBATCH --{key}={value}" for key, value in sbatch.items()]
+    lines += [f'#SBATCH --job-name="{job_name}"'] + list(extra)
+    lines += ['', '# Environment modules exist only on the cluster; local runs use the current Python',
+              'if command -v module >/dev/null 2>&1; then']
+    lines += [f"    module load {module}" for module in spec['modules']]
+    lines += ['fi', '', 'cd "$SLURM_SUBMIT_DIR"', '']
+    return lines
+
+def array_script(spec, spec_path):
+    slices = task_slices(spec['iterations'], spec['tasks'])
+    lines = _header(spec, spec['name'], ['#SBATCH --requeue', f"#SBATCH --array=0-{spec['tasks'] - 1}",
+                                         "#SBATCH --output=slurm-%A_%a.out"])
+    lines += ['# Iteration slice of each array task (generated from ' + spec_path + ')',
+              'STARTS=(' + ' '.join(str(start) for start, _ in slices) + ')',
+              'COUNTS=(' + ' '.join(str(count) for _, count in slices) + ')',
+              'START=${STARTS[$SLURM_ARRAY_TASK_ID]}',
+              'COUNT=${COUNTS[$SLURM_ARRAY_TASK_ID]}',
+              '',
+              '# A requeued task skips the iterations its manifest already records',
+              'python repetition.py --start "$START" --iterations "$COUNT"'
+              f" --shots {spec['shots']} --seed {spec['seed']} --qubits {spec['qubits']}"
+              f" --workers {spec['workers']} --out '{spec['out']}'"
+              f" --manifest \"{task_manifest(spec, '$SLURM_ARRAY_TASK_ID')}\""
+              + (' --full' if spec['full'] else f" --sampler '{shared_paths(spec)[1]}'")]
+    return '\n'.join(lines) + '\n'
+
+def prepare_script(spec, spec_path):
+    # Resampling campaigns simulate once: dump the statevector, then build the alias tables every task opens
+    statevector, sampler = shared_paths(spec)
+    lines = _header(spec, spec['name'] + '-prepare', ['#SBATCH --output=slurm-%j.out'], job='prepare')
+    lines += [f"# Shared inputs of the array tasks (generated from {spec_path})",
+              f"if [ ! -f '{sampler}.blocks.npz' ]; then",
+              f"    python statevector_store.py simulate --out '{statevector}' --qubits {spec['qubits']}",
+              f"    python repetition.py --iterations 0 --qubits {spec['qubits']} --no-manifest"
+              f" --statevector '{statevector}' --sampler '{sampler}' --out '{spec['out']}'",
+              'fi']
+    return '\n'.join(lines) + '\n'
+
+def reduce_script(spec, spec_path):
+    lines = _header(spec, spec['name'] + '-reduce', ['#SBATCH --output=slurm-%j.out'], job='reduce')
+    lines += [f"python slurm_campaign.py reduce {spec_path}"]
+    return '\n'.join(lines) + '\n'
+
+def generate(spec_path, out_dir='.'):
+    # (prepare, array, reduce) script paths; prepare is None for campaigns that re-simulate every iteration
+    spec = load_spec(spec_path)
+    prepare_file = None if spec['full'] else os.path.join(out_dir, f"{spec['name']}-prepare.sbatch")
+    array_file = os.path.join(out_dir, f"{spec['name']}.sbatch")
+    reduce_file = os.path.join(out_dir, f"{spec['name']}-reduce.sbatch")
+    os.makedirs(out_dir or '.', exist_ok=True)
+    if prepare_file:
+        with open(prepare_file, 'w') as f:
+            f.write(prepare_script(spec, spec_path))
+    with open(array_file, 'w') as f:
+        f.write(array_script(spec, spec_path))
+    with open(reduce_file, 'w') as f:
+        f.write(reduce_script(spec, spec_path))
+    return prepare_file, array_file, reduce_file
+
+def reduce_campaign(spec_path, batch=8):
+    # Check every shard is complete, then merge the per-iteration counts into the aggregate
+    from results_store import read_counts, write_counts
+
+    spec = load_spec(spec_path)
+    missing = []
+    for task, (start, count) in enumerate(task_slices(spec['iterations'], spec['tasks'])):
+        manifest = CampaignManifest(task_manifest(spec, task))
+        missing += manifest.pending(range(start, start + count), lambda i: iteration_seed(spec['seed'], i),
+                                    spec['shots'], spec['out'])
+    if missing:
+        raise RuntimeError(f"{len(missing)} iterations are missing or corrupt: {missing}")
+
+    # Merge a few files at a time so memory follows the distinct outcomes, not the number of files
+    total = None
+    pending = []
+    for i in range(spec['iterations']):
+        pending.append(read_counts(spec['out'].format(i=i)))
+        if len(pending) == batch or i == spec['iterations'] - 1:
+            merged = pending[0].merge(*pending[1:])
+            total = merged if total is None else total.merge(merged)
+            pending = []
+    write_counts(total, spec['aggregate'], iterations=spec['iterations'], master_seed=spec['seed'],
+                 shots_per_iteration=spec['shots'])
+    return total
+
+def run_local(spec_path, parallel=2):
+    # Fake sbatch: each array task is a local bash process with the SLURM variables set, then the reducer
+    prepare_file, array_file, reduce_file = generate(spec_path, os.path.dirname(spec_path) or '.')
+    spec = load_spec(spec_path)
+    env = dict(os.environ, SLURM_SUBMIT_DIR=os.getcwd(), SLURM_ARRAY_JOB_ID='local')
+    if prepare_file and subprocess.run(['bash', prepare_file], env=env).returncode:
+        print("Prepare job failed")
+        return 1
+    running = []
+    failed = []
+    for task in range(spec['tasks']):
+        while len(running) >= parallel:
+            running = _reap(running, failed)
+        log = open(f"slurm-local_{task}.out", 'w')
+        process = subprocess.Popen(['bash', array_file], stdout=log, stderr=subprocess.STDOUT,
+                                   env=dict(env, SLURM_ARRAY_TASK_ID=str(task)))
+        running.append((task, process, log))
+    while running:
+        running = _reap(running, failed)
+    if failed:
+        print(f"Array tasks failed: {failed}")
+        return 1
+    return subprocess.run(['bash', reduce_file], env=env).returncode
+
+def _reap(running, failed):
+    still_running = []
+    for task, process, log in running:
+        if process.poll() is None:
+            still_running.append((task, process, log))
+            continue
+        log.close()
+        print(f"Task {task} finished with exit code {process.returncode}")
+        if process.returncode:
+            failed.append(task)
+    if len(still_running) == len(running):
+        time.sleep(0.1)
+    return still_running
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Generate, run locally and reduce SLURM array campaigns.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    generate_parser = subparsers.add_parser('generate', help="Write the array and reduce sbatch scripts.")
+    generate_parser.add_argument('spec', help="Path to the JSON campaign spec.")
+    generate_parser.add_argument('--out-dir', default='.', help="Directory of the generated scripts.")
+
+    reduce_parser = subparsers.add_parser('reduce', help="Merge the shard outputs into the aggregate.")
+    reduce_parser.add_argument('spec', help="Path to the JSON campaign spec.")
+
+    local_parser = subparsers.add_parser('local', help="Run the array tasks as local processes, then reduce.")
+    local_parser.add_argument('spec', help="Path to the JSON campaign spec.")
+    local_parser.add_argument('--parallel', type=int, default=2, help="Array tasks running at once.")
+
+    args = parser.parse_args()
+
+    if args.command == 'generate':
+        prepare_file, array_file, reduce_file = generate(args.spec, args.out_dir)
+        if prepare_file:
+            print(f"Submit with: pid=$(sbatch --parsable {prepare_file}) && "
+                  f"jid=$(sbatch --parsable --dependency=afterok:$pid {array_file}) && "
+                  f"sbatch --dependency=afterok:$jid {reduce_file}")
+        else:
+            print(f"Submit with: jid=$(sbatch --parsable {array_file}) && sbatch --dependency=afterok:$jid {reduce_file}")
+    elif args.command == 'reduce':
+        total = reduce_campaign(args.spec)
+        print(f"Merged {total.shots} shots into {len(total)} outcomes")
+    else:
+        sys.exit(run_local(args.spec, args.parallel))
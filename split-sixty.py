@@ -1,5 +1,6 @@
-from qiskit import QuantumCircuit, transpile
-from qiskit_aer import AerSimulator
+import argparse
+import os
+from qiskit import QuantumCircuit
 
 def generate_data_partition(partition):
     # Initialize a Quantum Circuit for the partition
@@ -45,32 +46,31 @@ def generate_data_partition(partition):
 
     return qc
 
-def run_qiskit_simulation(qc):
-    # Use Qiskit's Aer simulator for local simulation
-    simulator = AerSimulator()
-
-    # Transpile the circuit for the simulator
-    compiled_circuit = transpile(qc, simulator)
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the two 30-qubit partitions.")
+    parser.add_argument('--exact', default=None, help="Write each partition's exact probability vector to this "
+                                                      "directory instead of sampling 1000000 shots.")
 
-    try:
-        # Run the simulation
-        result = simulator.run(compiled_circuit, shots=1000000).result()
-        counts = result.get_counts(compiled_circuit)
-        return counts
-    except Exception as e:
-        print(f"Error during simulation: {e}")
-        return None
+    args = parser.parse_args()
 
-if __name__ == "__main__":
     # Generate data for each partition
     qc_partition1 = generate_data_partition(partition=1)
     qc_partition2 = generate_data_partition(partition=2)
 
-    # Run the simulation for each partition
-    counts_partition1 = run_qiskit_simulation(qc_partition1)
-    counts_partition2 = run_qiskit_simulation(qc_partition2)
+    if args.exact:
+        from exact_probabilities import write_exact
+
+        # One 30-qubit vector at a time: each needs its 16 GiB statevector while it is computed
+        for i, qc in enumerate([qc_partition1, qc_partition2], start=1):
+            write_exact(qc, os.path.join(args.exact, f'partition{i}.npz'), partition=i)
+    else:
+        # The partitions are independent, so simulate them concurrently
+        from fragment_executor import run_fragments
+
+        counts_partition1, counts_partition2 = (counts.to_dict() for counts in
+                                                run_fragments([qc_partition1, qc_partition2], shots=1000000))
 
-    # Handle results (e.g., merge, analyze, or compare)
-    print("Partition 1 Results:", counts_partition1)
-    print("Partition 2 Results:", counts_partition2)
+        # Handle results (e.g., merge, analyze, or compare)
+        print("Partition 1 Results:", counts_partition1)
+        print("Partition 2 Results:", counts_partition2)
 
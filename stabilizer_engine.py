@@ -0,0 +1,324 @@
+import argparse
+import math
+import time
+import numpy as np
+
+# Generators up to this many: enumerate all 2^k outcomes and draw one multinomial instead of per-shot bits
+ENUMERATE_BITS = 20
+# Shots whose outcome words are built at once
+SHOT_CHUNK = 1 << 16
+
+def _popcount(words):
+    # Set bits per row of a uint64 array, summed over the last axis
+    if hasattr(np, 'bitwise_count'):
+        return np.bitwise_count(words).sum(axis=-1, dtype=np.int64)
+    return np.unpackbits(words.view(np.uint8), axis=-1).sum(axis=-1, dtype=np.int64)
+
+def _pack_rows(bits):
+    # (rows, n) 0/1 -> (rows, ceil(n / 64)) uint64, bit j of a row in word j // 64, bit j % 64
+    packed = np.packbits(bits.astype(np.uint8), axis=1, bitorder='little')
+    padded = np.zeros((bits.shape[0], -(-bits.shape[1] // 64) * 8), dtype=np.uint8)
+    padded[:, :packed.shape[1]] = packed
+    return padded.view('<u8').astype(np.uint64)
+
+def _unpack_rows(words, n):
+    return np.unpackbits(words.astype('<u8').view(np.uint8), axis=1, bitorder='little')[:, :n]
+
+def is_clifford(qc):
+    from planner import IGNORED, _is_clifford
+
+    return all(_is_clifford(i.operation.name, i.operation.params) for i in qc.data if i.operation.name not in IGNORED)
+
+class StabilizerState:
+    """Aaronson-Gottesman tableau with each qubit's x and z columns bit-packed over the 2n generator rows.
+
+    Rows 0..n-1 are destabilizers, rows n..2n-1 stabilizers. A gate is a few word-wide XOR/AND operations on
+    the columns of its qubits, so it costs O(n / 64) whatever the circuit depth.
+    """
+
+    def __init__(self, num_qubits):
+        n = num_qubits
+        self.num_qubits = n
+        words = -(-2 * n // 64)
+        self.x = np.zeros((n, words), dtype=np.uint64)
+        self.z = np.zeros((n, words), dtype=np.uint64)
+        self.r = np.zeros(words, dtype=np.uint64)
+        for q in range(n):
+            # Destabilizer q is X_q, stabilizer q is Z_q: |0...0>
+            self.x[q, q // 64] = np.uint64(1) << np.uint64(q % 64)
+            self.z[q, (n + q) // 64] = np.uint64(1) << np.uint64((n + q) % 64)
+
+    def h(self, q):
+        self.r ^= self.x[q] & self.z[q]
+        self.x[q], self.z[q] = self.z[q].copy(), self.x[q].copy()
+
+    def s(self, q):
+        self.r ^= self.x[q] & self.z[q]
+        self.z[q] ^= self.x[q]
+
+    def sdg(self, q):
+        self.r ^= self.x[q] & ~self.z[q]
+        self.z[q] ^= self.x[q]
+
+    def pauli_x(self, q):
+        self.r ^= self.z[q]
+
+    def pauli_y(self, q):
+        self.r ^= self.x[q] ^ self.z[q]
+
+    def pauli_z(self, q):
+        self.r ^= self.x[q]
+
+    def cx(self, a, b):
+        self.r ^= self.x[a] & self.z[b] & ~(self.x[b] ^ self.z[a])
+        self.x[b] ^= self.x[a]
+        self.z[a] ^= self.z[b]
+
+    def cz(self, a, b):
+        self.h(b)
+        self.cx(a, b)
+        self.h(b)
+
+    def cy(self, a, b):
+        self.sdg(b)
+        self.cx(a, b)
+        self.s(b)
+
+    def swap(self, a, b):
+        self.x[[a, b]] = self.x[[b, a]]
+        self.z[[a, b]] = self.z[[b, a]]
+
+    def _quarter_turns(self, name, angle, q):
+        # rx / ry / rz / p by a multiple of pi/2, up to global phase
+        turns = int(round(float(angle) / (math.pi / 2))) % 4
+        before, after = {'rx': ([self.h], [self.h]), 'ry': ([self.sdg, self.h], [self.h, self.s])}.get(name, ([], []))
+        for gate in before:
+            gate(q)
+        for _ in range(turns):
+            self.s(q)
+        for gate in after:
+            gate(q)
+
+    def apply(self, name, qubits, params=()):
+        single = {'h': self.h, 's': self.s, 'sdg': self.sdg, 'x': self.pauli_x, 'y': self.pauli_y,
+                  'z': self.pauli_z}
+        pair = {'cx': self.cx, 'cz': self.cz, 'cy': self.cy, 'swap': self.swap}
+        if name in single:
+            single[name](*qubits)
+        elif name in pair:
+            pair[name](*qubits)
+        elif name in ('sx', 'sxdg'):
+            self.h(qubits[0])
+            (self.s if name == 'sx' else self.sdg)(qubits[0])
+            self.h(qubits[0])
+        elif name in ('rx', 'ry', 'rz', 'p', 'u1'):
+            self._quarter_turns(name, params[0], qubits[0])
+        elif name != 'id':
+            raise ValueError(f"'{name}' is not a Clifford gate the stabilizer engine supports")
+        return self
+
+    def apply_circuit(self, qc):
+        # Final measurements are implied; gates after a measurement are not supported
+        measured = set()
+        for instruction in qc.data:
+            name = instruction.operation.name
+            qubits = [qc.find_bit(q).index for q in instruction.qubits]
+            if name == 'measure':
+                measured.update(qubits)
+                continue
+            if name == 'barrier':
+                continue
+            if measured.intersection(qubits):
+                raise ValueError("mid-circuit measurements are not supported")
+            self.apply(name, qubits, instruction.operation.params)
+        return self
+
+    def _stabilizer_rows(self):
+        # Row-major packed (x, z) of the n stabilizers plus their signs
+        n = self.num_qubits
+        x = _pack_rows(_unpack_rows(self.x, 2 * n)[:, n:].T)
+        z = _pack_rows(_unpack_rows(self.z, 2 * n)[:, n:].T)
+        r = _unpack_rows(self.r[None, :], 2 * n)[0, n:].astype(np.int64)
+        return x, z, r
+
+    def support(self):
+        # The measurement distribution is uniform on x0 + span(generators): Gaussian elimination puts the
+        # stabilizers' X parts in echelon form; the remaining Z-type rows (-1)^r Z^v fix v . x0 = r
+        n = self.num_qubits
+        x, z, r = self._stabilizer_rows()
+        rank = self._eliminate(x, z, r, x, 0)
+        self._eliminate(x, z, r, z, rank)
+        x0 = np.zeros(x.shape[1], dtype=np.uint64)
+        for row in range(rank, n):
+            bits = _unpack_rows(z[row:row + 1], n)[0]
+            pivot = int(np.argmax(bits))
+            if bits[pivot] and r[row]:
+                x0[pivot // 64] |= np.uint64(1) << np.uint64(pivot % 64)
+        return x0, x[:rank].copy()
+
+    def _eliminate(self, x, z, r, key, start):
+        # Reduced row echelon form of rows start.. on the bits of `key` (x or z), multiplying Paulis with phases
+        n = self.num_qubits
+        k = start
+        for column in range(n):
+            word, bit = column // 64, np.uint64(column % 64)
+            has = ((key[start:, word] >> bit) & np.uint64(1)).astype(bool)
+            candidates = np.flatnonzero(has[k - start:]) + k
+            if candidates.size == 0:
+                continue
+            pivot = candidates[0]
+            if pivot != k:
+                for array in (x, z):
+                    array[[k, pivot]] = array[[pivot, k]]
+                r[[k, pivot]] = r[[pivot, k]]
+                has[[k - start, pivot - start]] = has[[pivot - start, k - start]]
+            targets = np.flatnonzero(has) + start
+            targets = targets[targets != k]
+            if targets.size and key is z:
+                # Rows without X parts are Z strings: products need no phase beyond the signs
+                r[targets] ^= r[k]
+                z[targets] ^= z[k]
+            elif targets.size:
+                self._rowsum(x, z, r, targets, k)
+            k += 1
+            if k == n:
+                break
+        return k
+
+    @staticmethod
+    def _rowsum(x, z, r, targets, pivot):
+        # Rows `targets` <- pivot * target, with the sign from the Aaronson-Gottesman g function
+        x1, z1 = x[pivot], z[pivot]
+        x2, z2 = x[targets], z[targets]
+        g = (_popcount(x1 & z1 & z2 & ~x2) - _popcount(x1 & z1 & x2 & ~z2)
+             + _popcount(x1 & ~z1 & z2 & x2) - _popcount(x1 & ~z1 & z2 & ~x2)
+             + _popcount(~x1 & z1 & x2 & ~z2) - _popcount(~x1 & z1 & x2 & z2))
+        r[targets] = ((2 * r[targets] + 2 * r[pivot] + g) % 4) // 2
+        x[targets] ^= x1
+        z[targets] ^= z1
+
+    def sample_words(self, shots, seed=None):
+        # (outcome words, counts): packed rows with their multiplicities, bit q of a row being qubit q. Rows are
+        # distinct when the support is enumerated, otherwise one row per shot in draw order
+        rng = np.random.default_rng(seed)
+        x0, generators = self.support()
+        k = generators.shape[0]
+        if k <= ENUMERATE_BITS:
+            points = x0[None, :]
+            for g in generators:
+                points = np.concatenate([points, points ^ g])
+            counts = rng.multinomial(shots, np.full(points.shape[0], 1.0 / points.shape[0]))
+            keep = np.flatnonzero(counts)
+            return points[keep], counts[keep]
+
+        # Outcome = x0 ^ S.G for a uniform selector row S. In reduced row echelon form the pivot columns of G
+        # are an identity, so those outcome bits are S itself; only the other columns need the GF(2) product
+        n = self.num_qubits
+        bits = _unpack_rows(generators, n)
+        pivots = np.argmax(bits, axis=1)
+        free = np.setdiff1d(np.flatnonzero(bits.any(axis=0)), pivots)
+        reduced = _pack_rows(bits[:, free])
+        # Four Russians: table[j][b] is the XOR of the reduced generators 8j.. selected by the bits of byte b
+        tables = []
+        for j in range(0, k if free.size else 0, 8):
+            table = np.zeros((1, reduced.shape[1]), dtype=np.uint64)
+            for g in reduced[j:j + 8]:
+                table = np.concatenate([table, table ^ g])
+            tables.append(table)
+        selector_words = -(-k // 64)
+        tail = np.uint64((1 << (k % 64)) - 1) if k % 64 else ~np.uint64(0)
+        words = np.empty((shots, x0.size), dtype=np.uint64)
+        for start in range(0, shots, SHOT_CHUNK):
+            count = min(SHOT_CHUNK, shots - start)
+            selectors = rng.integers(0, ~np.uint64(0), (count, selector_words), dtype=np.uint64, endpoint=True)
+            selectors[:, -1] &= tail
+            chunk = words[start:start + count]
+            chunk[:] = x0
+            _place_bits(selectors, pivots, chunk)
+            if tables:
+                selector_bytes = selectors.view(np.uint8)
+                product = np.zeros((count, reduced.shape[1]), dtype=np.uint64)
+                for j, table in enumerate(tables):
+                    product ^= table[selector_bytes[:, j]]
+                _place_bits(product, free, chunk)
+        return words, np.ones(shots, dtype=np.int64)
+
+    def sample_counts(self, shots, seed=None):
+        # A Counts over up to 64 qubits; wider outcomes stay packed, see sample_words()
+        from counts import Counts
+
+        n = self.num_qubits
+        if n > 64:
+            raise ValueError(f"integer outcomes need at most 64 qubits, the state has {n}; use sample_words()")
+        words, counts = self.sample_words(shots, seed)
+        return Counts(words[:, 0], counts, n)
+
+def _place_bits(rows, columns, out):
+    # XOR the packed bits of `rows` into `out`, bit j of a row landing on bit columns[j]
+    if columns.size and columns[-1] - columns[0] == columns.size - 1:
+        # A contiguous run is a word shift
+        first, shift = divmod(int(columns[0]), 64)
+        out[:, first:first + rows.shape[1]] ^= rows << np.uint64(shift)
+        if shift:
+            # Bits pushed past the last word would lie beyond the run, so they are zero
+            end = min(first + rows.shape[1] + 1, out.shape[1])
+            out[:, first + 1:end] ^= rows[:, :end - first - 1] >> np.uint64(64 - shift)
+        return out
+    bits = np.zeros((rows.shape[0], 64 * out.shape[1]), dtype=np.uint8)
+    bits[:, columns] = _unpack_rows(rows, columns.size)
+    out ^= _pack_rows(bits)
+    return out
+
+def _bitstrings(words, n):
+    chars = _unpack_rows(words, n)[:, ::-1] + ord('0')
+    return np.ascontiguousarray(chars).view(f'S{n}').ravel()
+
+def run_stabilizer(qc, shots, seed=None):
+    # qiskit-style {'bitstring': count} at any width, like result.get_counts(); prefer sample_words() for wide,
+    # high-entropy circuits, whose every shot is a distinct string here
+    state = StabilizerState(qc.num_qubits).apply_circuit(qc)
+    if qc.num_qubits <= 64:
+        return state.sample_counts(shots, seed).to_dict()
+    words, counts = state.sample_words(shots, seed)
+    unique, inverse = np.unique(words.view(f'V{8 * words.shape[1]}').ravel(), return_inverse=True)
+    counts = np.bincount(inverse.ravel(), weights=counts).astype(np.int64)
+    strings = _bitstrings(unique.view(np.uint64).reshape(-1, words.shape[1]), qc.num_qubits)
+    return {s.decode(): int(c) for s, c in zip(strings, counts)}
+
+def ghz_circuit(num_qubits):
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits)
+    qc.h(0)
+    for qubit in range(num_qubits - 1):
+        qc.cx(qubit, qubit + 1)
+    return qc
+
+def h_cx_brickwork(num_qubits, num_layers=3):
+    # five-partion*.py pattern: H on every qubit, then staggered cx, per layer
+    from qiskit import QuantumCircuit
+
+    qc = QuantumCircuit(num_qubits)
+    for layer in range(num_layers):
+        qc.h(range(num_qubits))
+        for i in range(layer % 2, num_qubits - 1, 2):
+            qc.cx(i, i + 1)
+    return qc
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Sample Clifford circuits with a bit-packed stabilizer tableau.")
+    parser.add_argument('--circuit', default='ghz', choices=['ghz', 'brickwork'], help="GHZ chain or H + cx brickwork.")
+    parser.add_argument('--qubits', type=int, default=1000, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=3, help="Layers of the H + cx brickwork.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Number of sampled shots.")
+    parser.add_argument('--seed', type=int, default=None, help="Seed for shot sampling.")
+
+    args = parser.parse_args()
+
+    qc = ghz_circuit(args.qubits) if args.circuit == 'ghz' else h_cx_brickwork(args.qubits, args.layers)
+    start = time.perf_counter()
+    state = StabilizerState(args.qubits).apply_circuit(qc)
+    print(f"Tableau of {args.qubits} qubits, {len(qc.data)} gates in {time.perf_counter() - start:.3f} s")
+    start = time.perf_counter()
+    words, counts = state.sample_words(args.shots, args.seed)
+    print(f"Sampled {args.shots} shots as {words.shape[1]}-word packed rows in {time.perf_counter() - start:.3f} s")
@@ -0,0 +1,265 @@
+import argparse
+import time
+import numpy as np
+from brickwork import brickwork_pairs, default_gates, normalize_gates
+
+# Number of amplitudes touched per block; keeps the scratch buffer cache-resident (2 MB)
+CHUNK_SIZE = 1 << 16
+
+def gate_matrix(name, angle=None):
+    # Unitaries in qiskit's little-endian convention (first qarg is the low bit)
+    if name == 'h':
+        return np.array([[1, 1], [1, -1]], dtype=complex) / np.sqrt(2)
+    if name == 'x':
+        return np.array([[0, 1], [1, 0]], dtype=complex)
+    if name == 'y':
+        return np.array([[0, -1j], [1j, 0]], dtype=complex)
+    if name == 'z':
+        return np.diag([1, -1]).astype(complex)
+    if name == 's':
+        return np.diag([1, 1j])
+    if name == 'sdg':
+        return np.diag([1, -1j])
+    if name == 'rx':
+        c, s = np.cos(angle / 2), np.sin(angle / 2)
+        return np.array([[c, -1j * s], [-1j * s, c]])
+    if name == 'ry':
+        c, s = np.cos(angle / 2), np.sin(angle / 2)
+        return np.array([[c, -s], [s, c]], dtype=complex)
+    if name == 'rz':
+        return np.diag([np.exp(-0.5j * angle), np.exp(0.5j * angle)])
+    if name == 'cx':
+        return np.array([[1, 0, 0, 0], [0, 0, 0, 1], [0, 0, 1, 0], [0, 1, 0, 0]], dtype=complex)
+    if name == 'cz':
+        return np.diag([1, 1, 1, -1]).astype(complex)
+    if name == 'swap':
+        return np.array([[1, 0, 0, 0], [0, 0, 1, 0], [0, 1, 0, 0], [0, 0, 0, 1]], dtype=complex)
+    raise ValueError(f"Unsupported gate: {name}")
+
+def brickwork_ops(num_qubits, single_qubit_gates=None, two_qubit_gates=None, num_layers=7, angle_first=True):
+    # Translate the generate_data() gate tables into (qubits, matrix) ops, one per gate
+    if single_qubit_gates is None:
+        gates = default_gates(num_qubits)
+    else:
+        gates = normalize_gates(single_qubit_gates, angle_first)
+    if two_qubit_gates is None:
+        two_qubit_gates = brickwork_pairs(num_qubits)
+
+    # Build each matrix once and share it between layers
+    single = [((qubit,), gate_matrix(name, angle)) for name, qubit, angle in gates]
+    cx = gate_matrix('cx')
+
+    ops = []
+    for layer in range(num_layers):
+        ops.extend(single)
+        ops.extend(((q1, q2), cx) for q1, q2 in two_qubit_gates[layer % 2])
+    return ops
+
+def circuit_to_ops(qc):
+    # Convert a QuantumCircuit into (qubits, matrix) ops, skipping measurements and barriers
+    from qiskit.quantum_info import Operator
+
+    ops = []
+    for instruction in qc.data:
+        operation = instruction.operation
+        if operation.name in ('measure', 'barrier'):
+            continue
+        qubits = tuple(qc.find_bit(q).index for q in instruction.qubits)
+        try:
+            matrix = operation.to_matrix()
+        except Exception:
+            matrix = Operator(operation).data
+        ops.append((qubits, np.asarray(matrix, dtype=complex)))
+    return ops
+
+def allocate_state(num_qubits, dtype=np.complex128, out=None):
+    # Preallocate |0...0>; pass out= to reuse a buffer (or a memory map) between runs
+    if out is None:
+        out = np.empty(2 ** num_qubits, dtype=dtype)
+    out.fill(0)
+    out[0] = 1
+    return out
+
+def _gate_view(psi, num_qubits, qubits):
+    # Reshape the flat state so every gate qubit gets its own axis of length 2
+    order = sorted(qubits, reverse=True)
+    shape = []
+    upper = num_qubits
+    for qubit in order:
+        shape.extend([2 ** (upper - qubit - 1), 2])
+        upper = qubit
+    shape.append(2 ** upper)
+    return psi.reshape(shape), order
+
+def _blocks(free_shape, chunk_size):
+    # Yield index tuples that cover the free axes in blocks of at most chunk_size amplitudes
+    inner = 1
+    split = len(free_shape)
+    while split > 0 and inner * free_shape[split - 1] <= chunk_size:
+        split -= 1
+        inner *= free_shape[split]
+
+    if split == 0:
+        yield tuple(slice(None) for _ in free_shape)
+        return
+
+    step = max(1, chunk_size // inner)
+    outer = free_shape[:split - 1]
+    for prefix in np.ndindex(*outer):
+        for start in range(0, free_shape[split - 1], step):
+            block = slice(start, min(start + step, free_shape[split - 1]))
+            yield prefix + (block,) + tuple(slice(None) for _ in free_shape[split:])
+
+def _target_indices(qubits, order):
+    # For every matrix row, the axis values of the gate qubits in view order
+    targets = []
+    for row in range(2 ** len(qubits)):
+        bits = {qubit: (row >> position) & 1 for position, qubit in enumerate(qubits)}
+        targets.append([bits[qubit] for qubit in order])
+    return targets
+
+def _sorted_matrix(qubits, matrix):
+    # Reorder a gate matrix so its rows follow the qubits in ascending order
+    ascending = sorted(qubits)
+    perm = []
+    for row in range(2 ** len(qubits)):
+        index = 0
+        for position, qubit in enumerate(qubits):
+            index |= ((row >> ascending.index(qubit)) & 1) << position
+        perm.append(index)
+    return matrix[np.ix_(perm, perm)]
+
+def _apply_adjacent(psi, num_qubits, qubits, matrix, scratch, chunk_size):
+    # Gate on neighbouring qubits: one (A, D, B) view, contracted block by block
+    low = min(qubits)
+    dim = 2 ** len(qubits)
+    inner = 2 ** low
+    matrix = _sorted_matrix(qubits, matrix)
+    view = psi.reshape(-1, dim, inner)
+
+    if not np.any(matrix - np.diag(np.diag(matrix))):
+        # Phases only: scale each slice in place
+        for row in range(dim):
+            if matrix[row, row] != 1:
+                view[:, row, :] *= matrix[row, row]
+        return
+
+    if dim * inner <= 32:
+        # Low qubits: one contiguous GEMM against kron(matrix, I) beats tiny batched products
+        rows = psi.reshape(-1, dim * inner)
+        kron = np.kron(matrix, np.eye(inner, dtype=psi.dtype)).T.copy()
+        step = max(1, chunk_size // (dim * inner))
+        for start in range(0, rows.shape[0], step):
+            block = rows[start:start + step]
+            result = scratch[:block.size].reshape(block.shape)
+            np.matmul(block, kron, out=result)
+            block[...] = result
+        return
+
+    if dim * inner <= chunk_size:
+        step = chunk_size // (dim * inner)
+        for start in range(0, view.shape[0], step):
+            block = view[start:start + step]
+            result = scratch[:block.size].reshape(block.shape)
+            np.matmul(matrix, block, out=result)
+            block[...] = result
+        return
+
+    step = max(1, chunk_size // dim)
+    for outer in range(view.shape[0]):
+        for start in range(0, inner, step):
+            block = view[outer, :, start:start + step]
+            result = scratch[:block.size].reshape(block.shape)
+            np.matmul(matrix, block, out=result)
+            block[...] = result
+
+def _apply_general(psi, num_qubits, qubits, matrix, scratch, chunk_size):
+    # Gate on arbitrary qubits: gather the 2^k sub-blocks, contract, scatter back
+    view, order = _gate_view(psi, num_qubits, qubits)
+    targets = _target_indices(qubits, order)
+    dim = len(targets)
+    free_shape = view.shape[0::2]
+    step = max(1, min(chunk_size, psi.size) // dim)
+    gathered_buffer = scratch[:dim * step].reshape(dim, step)
+    result_buffer = scratch[dim * step:2 * dim * step].reshape(dim, step)
+
+    for block in _blocks(free_shape, step):
+        subs = []
+        for target in targets:
+            index = [block[0]]
+            for bit, free in zip(target, block[1:]):
+                index.extend([bit, free])
+            subs.append(tuple(index))
+
+        block_shape = view[subs[0]].shape
+        size = int(np.prod(block_shape))
+        gathered = gathered_buffer[:, :size]
+        for row, sub in enumerate(subs):
+            gathered[row].reshape(block_shape)[...] = view[sub]
+        result = result_buffer[:, :size]
+        np.matmul(matrix, gathered, out=result)
+        for row, sub in enumerate(subs):
+            view[sub] = result[row].reshape(block_shape)
+
+def apply_ops(psi, num_qubits, ops, chunk_size=CHUNK_SIZE):
+    # Apply (qubits, matrix) ops in place; all temporaries live in one reusable scratch buffer
+    width = max((len(qubits) for qubits, _ in ops), default=1)
+    scratch = np.empty(2 * max(min(chunk_size, psi.size), 32 * 2 ** width), dtype=psi.dtype)
+
+    for qubits, matrix in ops:
+        matrix = np.asarray(matrix, dtype=psi.dtype)
+        if max(qubits) - min(qubits) + 1 == len(qubits):
+            _apply_adjacent(psi, num_qubits, qubits, matrix, scratch, chunk_size)
+        else:
+            _apply_general(psi, num_qubits, qubits, matrix, scratch, chunk_size)
+
+    return psi
+
+def run_native_simulation(num_qubits=30, single_qubit_gates=None, two_qubit_gates=None, num_layers=7,
+                          angle_first=True, dtype=np.complex128, out=None, fuse=True):
+    # Native replacement for run_qiskit_simulation()'s statevector on the brickwork circuit
+    ops = brickwork_ops(num_qubits, single_qubit_gates, two_qubit_gates, num_layers, angle_first)
+    if fuse:
+        from gate_fusion import fuse_ops
+        ops = fuse_ops(ops)
+    psi = allocate_state(num_qubits, dtype, out)
+    return apply_ops(psi, num_qubits, ops)
+
+def run_aer_statevector(qc):
+    # Reference statevector from Aer on CPU, as in run_qiskit_simulation()
+    from qiskit import transpile
+    from qiskit_aer import AerSimulator
+
+    qc_no_measure = qc.remove_final_measurements(inplace=False)
+    qc_no_measure.save_statevector()
+    simulator = AerSimulator(method='statevector')
+    compiled_circuit = transpile(qc_no_measure, simulator, optimization_level=0)
+    result = simulator.run(compiled_circuit).result()
+    return np.asarray(result.get_statevector(compiled_circuit))
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate the brickwork circuit with the native NumPy engine.")
+    parser.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    parser.add_argument('--layers', type=int, default=7, help="Number of brickwork layers.")
+    parser.add_argument('--dtype', default='complex128', choices=['complex64', 'complex128'],
+                        help="Amplitude precision; complex64 halves memory (8 GB at 30 qubits).")
+    parser.add_argument('--no-fuse', action='store_true', help="Apply every gate separately instead of fused pairs.")
+    parser.add_argument('--compare', action='store_true', help="Also run Aer on CPU and compare statevectors.")
+
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    psi = run_native_simulation(args.qubits, num_layers=args.layers, dtype=np.dtype(args.dtype),
+                                fuse=not args.no_fuse)
+    native_time = time.perf_counter() - start
+    print(f"Native engine: {args.qubits} qubits in {native_time:.2f} s")
+
+    if args.compare:
+        from brickwork import generate_data
+
+        qc = generate_data(args.qubits, args.layers)
+        start = time.perf_counter()
+        reference = run_aer_statevector(qc)
+        aer_time = time.perf_counter() - start
+        print(f"Aer statevector: {args.qubits} qubits in {aer_time:.2f} s")
+        print(f"Max amplitude difference: {np.max(np.abs(psi - reference)):.3e}")
@@ -0,0 +1,114 @@
+import argparse
+import os
+import time
+import numpy as np
+
+# Amplitudes copied per step when converting into the memory map
+CHUNK_SIZE = 1 << 22
+
+def open_statevector_sink(path, num_qubits, dtype=np.complex128):
+    # Writable .npy memory map of 2^n amplitudes; engines can simulate straight into it
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    return np.lib.format.open_memmap(path, mode='w+', dtype=dtype, shape=(2 ** num_qubits,))
+
+def dump_statevector(psi, path, dtype=None, chunk_size=CHUNK_SIZE):
+    # Stream psi into a .npy file chunk by chunk; no Python objects per amplitude
+    psi = np.asarray(psi)
+    num_qubits = int(psi.size).bit_length() - 1
+    sink = open_statevector_sink(path, num_qubits, dtype or psi.dtype)
+    for start in range(0, psi.size, chunk_size):
+        sink[start:start + chunk_size] = psi[start:start + chunk_size]
+    sink.flush()
+    del sink
+    return path
+
+def load_statevector(path):
+    # Lazy, read-only view of a dumped statevector; pages are read from disk on access
+    return np.load(path, mmap_mode='r')
+
+class StatevectorReader:
+    """Bounded-memory queries over a dumped statevector, one chunk of the memory map at a time."""
+
+    def __init__(self, path, chunk_size=CHUNK_SIZE):
+        self.psi = load_statevector(path)
+        self.num_qubits = int(self.psi.size).bit_length() - 1
+        self.chunk_size = chunk_size
+
+    def _chunks(self):
+        for start in range(0, self.psi.size, self.chunk_size):
+            yield start, np.asarray(self.psi[start:start + self.chunk_size])
+
+    def amplitudes(self, start, stop):
+        # Copy of psi[start:stop]; only that range is paged in
+        return np.array(self.psi[start:stop])
+
+    def probabilities(self, start, stop):
+        amplitudes = self.amplitudes(start, stop)
+        return amplitudes.real ** 2 + amplitudes.imag ** 2
+
+    def norm(self):
+        total = 0.0
+        for _, chunk in self._chunks():
+            total += float(np.vdot(chunk, chunk).real)
+        return np.sqrt(total)
+
+    def marginal(self, qubits):
+        # Probabilities of the 2^len(qubits) outcomes on `qubits`; qubits[j] is bit j of the outcome
+        marginal = np.zeros(2 ** len(qubits))
+        for start, chunk in self._chunks():
+            indices = np.arange(start, start + chunk.size, dtype=np.uint64)
+            keys = np.zeros(chunk.size, dtype=np.int64)
+            for position, qubit in enumerate(qubits):
+                keys |= ((indices >> np.uint64(qubit)) & np.uint64(1)).astype(np.int64) << position
+            marginal += np.bincount(keys, weights=chunk.real ** 2 + chunk.imag ** 2, minlength=marginal.size)
+        return marginal
+
+    def top_k(self, k):
+        # The k most probable basis states as (indices, probabilities), most probable first
+        best_indices = np.empty(0, dtype=np.int64)
+        best_probs = np.empty(0)
+        for start, chunk in self._chunks():
+            probs = chunk.real ** 2 + chunk.imag ** 2
+            if probs.size > k:
+                local = np.argpartition(probs, probs.size - k)[probs.size - k:]
+            else:
+                local = np.arange(probs.size)
+            best_indices = np.concatenate((best_indices, start + local))
+            best_probs = np.concatenate((best_probs, probs[local]))
+            if best_probs.size > k:
+                keep = np.argpartition(best_probs, best_probs.size - k)[best_probs.size - k:]
+                best_indices, best_probs = best_indices[keep], best_probs[keep]
+        order = np.argsort(-best_probs, kind='stable')
+        return best_indices[order], best_probs[order]
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Dump the brickwork statevector to .npy or inspect a dump.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    simulate = subparsers.add_parser('simulate', help="Simulate straight into a .npy memory map.")
+    simulate.add_argument('--out', required=True, help="Path to the output .npy file.")
+    simulate.add_argument('--qubits', type=int, default=30, help="Number of qubits.")
+    simulate.add_argument('--dtype', default='complex128', choices=['complex64', 'complex128'], help="Amplitude precision.")
+
+    inspect = subparsers.add_parser('inspect', help="Print norm, top-k states and marginals of a dump.")
+    inspect.add_argument('path', help="Path to the .npy statevector.")
+    inspect.add_argument('--top', type=int, default=10, help="Number of most probable states to print.")
+    inspect.add_argument('--qubits', type=int, nargs='*', default=[0], help="Qubits of the printed marginal.")
+
+    args = parser.parse_args()
+
+    if args.command == 'simulate':
+        from statevec_engine import run_native_simulation
+
+        start = time.perf_counter()
+        sink = open_statevector_sink(args.out, args.qubits, np.dtype(args.dtype))
+        run_native_simulation(args.qubits, dtype=sink.dtype, out=sink)
+        sink.flush()
+        print(f"Simulated {args.qubits} qubits into {args.out} in {time.perf_counter() - start:.2f} s")
+    else:
+        reader = StatevectorReader(args.path)
+        print(f"Qubits: {reader.num_qubits}, norm: {reader.norm():.12f}")
+        indices, probs = reader.top_k(args.top)
+        for index, prob in zip(indices, probs):
+            print(f"{int(index):0{reader.num_qubits}b} {prob:.6e}")
+        print(f"Marginal on qubits {args.qubits}: {reader.marginal(args.qubits)}")
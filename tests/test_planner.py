@@ -0,0 +1,27 @@
+import contextlib
+import importlib.util
+import io
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+def load_script(name):
+    # Scripts have hyphenated names, so they are loaded from their path
+    spec = importlib.util.spec_from_file_location(name.replace('-', '_'), os.path.join(ROOT, name + '.py'))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+def test_sixty_bw_plan_runs_on_one_simulator():
+    sixty_bw = load_script('sixty-bw')
+    # generate_data() prints the circuit
+    with contextlib.redirect_stdout(io.StringIO()):
+        qc = sixty_bw.generate_data()
+    simulator = sixty_bw.choose_simulator(qc, device='CPU')
+    assert simulator.options.method != 'partitioned'
+
+    counts = sixty_bw.run_qiskit_simulation(qc, shots=100, device='CPU')
+    assert sum(counts.values()) == 100
+    assert all(len(key) == 60 for key in counts)
@@ -1,7 +1,5 @@
 import random
 import argparse
-import csv
-import os
 import matplotlib.pyplot as plt
 from qiskit import QuantumCircuit, transpile
 from qiskit.visualization import plot_histogram
@@ -98,19 +96,15 @@ def generate_data():
    return qc
 
 def write_data_to_csv(data, csv_file):
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    # The path picks the format: *.npz is the binary counts store, anything else the Result,Count CSV
+    from counts import Counts
+    from results_store import write_counts
 
-    with open(csv_file, 'w', newline='') as cf:
-        csv_writer = csv.writer(cf)
-        csv_writer.writerow(['Result', 'Count'])  # Adjust the header according to your data format
-
-        for key, value in data.items():
-            csv_writer.writerow([key, value])
+    write_counts(Counts.from_dict(data), csv_file)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate data and save to CSV.")
-    parser.add_argument('--csv', required=True, help="Path to the output CSV file.")
+    parser.add_argument('--csv', required=True, help="Path to the output CSV file (.npz for the binary format).")
 
     args = parser.parse_args()
 
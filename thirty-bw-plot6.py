@@ -1,7 +1,5 @@
 import random
 import argparse
-import csv
-import os
 import matplotlib.pyplot as plt
 from qiskit import QuantumCircuit, transpile
 from qiskit.visualization import plot_histogram
@@ -104,23 +102,30 @@ def run_qiskit_simulation(qc):
     return counts
 
 def write_data_to_csv(data, csv_file):
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    # The path picks the format: *.npz is the binary counts store, anything else the Result,Count CSV
+    from counts import Counts
+    from results_store import write_counts
 
-    with open(csv_file, 'w', newline='') as cf:
-        csv_writer = csv.writer(cf)
-        csv_writer.writerow(['Result', 'Count'])  # Adjust the header according to your data format
-
-        for key, value in data.items():
-            csv_writer.writerow([key, value])
+    write_counts(Counts.from_dict(data), csv_file)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate data and save to CSV.")
-    parser.add_argument('--csv', required=True, help="Path to the output CSV file.")
+    parser.add_argument('--csv', default=None, help="Path to the output CSV file, or .npz for the binary format "
+                                                    "(required without --exact).")
+    parser.add_argument('--exact', default=None, help="Write the exact probability vector to this .npz file instead "
+                                                      "of sampling; --csv then gets counts derived from it.")
+    parser.add_argument('--shots', type=int, default=1000000, help="Number of derived shots for --exact --csv.")
 
     args = parser.parse_args()
+    if not args.csv and not args.exact:
+        parser.error("one of --csv or --exact is required")
 
     qc = generate_data()
-    counts = run_qiskit_simulation(qc)
-    write_data_to_csv(counts, args.csv)
+    if args.exact:
+        from exact_probabilities import write_exact
+
+        write_exact(qc, args.exact, shots=args.shots, counts_path=args.csv)
+    else:
+        counts = run_qiskit_simulation(qc)
+        write_data_to_csv(counts, args.csv)
 
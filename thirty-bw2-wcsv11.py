@@ -1,6 +1,4 @@
 import argparse
-import csv
-import os
 from qiskit import QuantumCircuit
 from qiskit_aer import AerSimulator
 from qiskit.compiler import transpile
@@ -55,6 +53,11 @@ def generate_data():
     return qc
 
 def run_qiskit_simulation(qc):
+    # Fail in milliseconds when a method cannot fit, instead of after the allocation is spent
+    from planner import preflight
+    preflight(qc, 'density_matrix')
+    preflight(qc, 'statevector')
+
     # For counts (standard simulation)
     simulator_counts = AerSimulator(method='density_matrix', device='GPU')
     transpiled_circuit_counts = transpile(qc, simulator_counts, optimization_level=0)  # Avoid backend constraints
@@ -71,30 +74,25 @@ def run_qiskit_simulation(qc):
     return counts, psi
 
 def write_data_to_csv(counts, psi, csv_file):
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
-
-    with open(csv_file, 'w', newline='') as cf:
-        csv_writer = csv.writer(cf)
-        csv_writer.writerow(['Result', 'Count', 'State Vector'])
-
-        # Write counts data
-        for key, value in counts.items():
-            csv_writer.writerow([key, value, ''])
+    # Result,Count,State Vector CSV, or binary counts and a .npy state vector for an .npz path
+    from one_pass_simulation import write_data_to_csv as write_counts_and_state
 
-        # Write statevector data
-        csv_writer.writerow(['', '', ''])
-        csv_writer.writerow(['State Vector', '', ''])
-        for vector in psi:
-            csv_writer.writerow(['', '', vector])
+    write_counts_and_state(counts, psi, csv_file)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate data and save to CSV.")
-    parser.add_argument('--csv', required=True, help="Path to the output CSV file.")
+    parser.add_argument('--csv', required=True, help="Path to the output CSV file, or .npz for binary counts "
+                                                     "with the state vector beside them.")
+    parser.add_argument('--single-run', action='store_true',
+                        help="Simulate the statevector once and sample the counts from it.")
 
     args = parser.parse_args()
 
     qc = generate_data()
-    counts, psi = run_qiskit_simulation(qc)
+    if args.single_run:
+        from one_pass_simulation import run_single_pass
+        counts, psi = run_single_pass(qc, shots=20000)
+    else:
+        counts, psi = run_qiskit_simulation(qc)
     write_data_to_csv(counts, psi, args.csv)
 
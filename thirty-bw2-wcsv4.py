@@ -1,6 +1,4 @@
 import argparse
-import csv
-import os
 from qiskit import QuantumCircuit
 from qiskit.visualization import plot_histogram
 from qiskit.compiler import transpile
@@ -71,19 +69,15 @@ def run_qiskit_simulation(qc):
     return counts, output, statevector, result
 
 def write_data_to_csv(data, csv_file):
-    # Create directory if it doesn't exist
-    os.makedirs(os.path.dirname(csv_file), exist_ok=True)
+    # The path picks the format: *.npz is the binary counts store, anything else the Result,Count CSV
+    from counts import Counts
+    from results_store import write_counts
 
-    with open(csv_file, 'w', newline='') as cf:
-        csv_writer = csv.writer(cf)
-        csv_writer.writerow(['Result', 'Count', 'State Vector', 'Output'])  # Adjust the header according to your data format
-
-        for key, value in data.items():
-            csv_writer.writerow([key, value])
+    write_counts(Counts.from_dict(data), csv_file)
 
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate data and save to CSV.")
-    parser.add_argument('--csv', required=True, help="Path to the output CSV file.")
+    parser.add_argument('--csv', required=True, help="Path to the output CSV file (.npz for the binary format).")
 
     args = parser.parse_args()
 
@@ -92,4 +86,4 @@ if __name__ == "__main__":
     counts, output, statevector, result = run_qiskit_simulation(qc)
 
 
-    write_data_to_csv(counts,output, statevector, result, args.csv)
+    write_data_to_csv(counts, args.csv)
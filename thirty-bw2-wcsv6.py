@@ -90,12 +90,20 @@ def write_data_to_csv(counts, result, statevector, csv_file):
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Generate data and save to CSV.")
     parser.add_argument('--csv', required=True, help="Path to the output CSV file.")
+    parser.add_argument('--single-run', action='store_true',
+                        help="Simulate the statevector once and sample the counts from it.")
 
     args = parser.parse_args()
 
     qc = generate_data()
 
-    counts, result, statevector = run_qiskit_simulation(qc)
+    if args.single_run:
+        from one_pass_simulation import run_single_pass
+        counts, statevector = run_single_pass(qc, shots=1000000)
+        # The writer does not use the qiskit Result
+        result = None
+    else:
+        counts, result, statevector = run_qiskit_simulation(qc)
 
     write_data_to_csv(counts, result, statevector, args.csv)
 